@@ -1,20 +1,50 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Request, render_template, request, jsonify, send_file, url_for, Response, stream_with_context
 import requests
 import os
-from datetime import datetime
+import re
+import json
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import anthropic
 from deep_translator import GoogleTranslator
 from dotenv import load_dotenv
-import tempfile
-import base64
+# Before the local modules below read their settings from the environment
+load_dotenv()
+import io
 import speech_recognition as sr
 from gtts import gTTS
 from flask_cors import CORS
+from forecast_cache import forecast_cache
+from geo_index import LocationIndex, NEAREST_MAX_KM, parse_coords
+from locations import GUJARAT_DISTRICTS, find_district
+from intents import classify_intent, WEATHER, COMMODITY
+from tts_cache import tts_cache, KEY_PATTERN, TTS_AUDIO_MAX_AGE
+from audio_pool import audio_pool, decode_wav, AudioPoolBusy
+from commodity_store import commodity_store, iter_records, latest_arrivals, live_page, to_row
+from commodity_analytics import analyze, analytics_cache, COMMODITY_ANALYTICS_DAYS
+import open_meteo
+from prewarm import ForecastPrewarmer, PREWARM_ENABLED
+from translation_cache import translate_segments, translation_cache
+from chunked_translation import translate_chunked
+from weather_i18n import CatalogStore
+import singleflight
+import http_encoding
+import upstream
 
-load_dotenv()
+# Largest request body accepted, which bounds the memory an audio upload can take
+MAX_AUDIO_UPLOAD_BYTES = int(os.environ.get('MAX_AUDIO_UPLOAD_BYTES', 10 * 1024 * 1024))
+
+class InMemoryRequest(Request):
+    """Keep uploaded files in memory instead of spooling large ones to a temp file"""
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return io.BytesIO()
 
 app = Flask(__name__)
+app.request_class = InMemoryRequest
+app.config['MAX_CONTENT_LENGTH'] = MAX_AUDIO_UPLOAD_BYTES
 CORS(app)  # Enable CORS for all routes
+http_encoding.init_app(app)
 
 CLAUDE_API_KEY = os.environ.get('CLAUDE_API_KEY')
 
@@ -26,43 +56,8 @@ else:
 
 # Speech recognition setup
 recognizer = sr.Recognizer()
-
-# Gujarat districts only
-GUJARAT_DISTRICTS = {
-    "Ahmedabad": {"lat": 23.0225, "lon": 72.5714},
-    "Amreli": {"lat": 21.6009, "lon": 71.2148},
-    "Anand": {"lat": 22.5645, "lon": 72.9289},
-    "Aravalli": {"lat": 23.2538, "lon": 73.0301},
-    "Banaskantha": {"lat": 24.1719, "lon": 72.4383},
-    "Bharuch": {"lat": 21.7051, "lon": 72.9959},
-    "Bhavnagar": {"lat": 21.7645, "lon": 72.1519},
-    "Botad": {"lat": 22.1693, "lon": 71.6669},
-    "Chhota Udaipur": {"lat": 22.3048, "lon": 74.0130},
-    "Dahod": {"lat": 22.8382, "lon": 74.2592},
-    "Dang": {"lat": 20.7331, "lon": 73.7056},
-    "Devbhoomi Dwarka": {"lat": 22.2394, "lon": 68.9678},
-    "Gandhinagar": {"lat": 23.2156, "lon": 72.6369},
-    "Gir Somnath": {"lat": 20.8955, "lon": 70.4008},
-    "Jamnagar": {"lat": 22.4707, "lon": 70.0577},
-    "Junagadh": {"lat": 21.5222, "lon": 70.4579},
-    "Kheda": {"lat": 22.7507, "lon": 72.6947},
-    "Kutch": {"lat": 23.7337, "lon": 69.8597},
-    "Mahisagar": {"lat": 23.0644, "lon": 73.6508},
-    "Mehsana": {"lat": 23.5958, "lon": 72.3693},
-    "Morbi": {"lat": 22.8173, "lon": 70.8378},
-    "Narmada": {"lat": 21.9045, "lon": 73.5004},
-    "Navsari": {"lat": 20.9467, "lon": 72.9520},
-    "Panchmahal": {"lat": 22.8556, "lon": 73.4285},
-    "Patan": {"lat": 23.8502, "lon": 72.1262},
-    "Porbandar": {"lat": 21.6417, "lon": 69.6293},
-    "Rajkot": {"lat": 22.3039, "lon": 70.8022},
-    "Sabarkantha": {"lat": 23.9441, "lon": 72.9814},
-    "Surat": {"lat": 21.1702, "lon": 72.8311},
-    "Surendranagar": {"lat": 22.7196, "lon": 71.6369},
-    "Tapi": {"lat": 21.1307, "lon": 73.3733},
-    "Vadodara": {"lat": 22.3072, "lon": 73.1812},
-    "Valsad": {"lat": 20.5992, "lon": 72.9342}
-}
+# Seconds clients are told to wait when voice requests are rejected as busy
+AUDIO_RETRY_AFTER = 1
 
 SUPPORTED_LANGUAGES = {
     'en': {'name': 'English', 'sr_lang': 'en-IN', 'tts_lang': 'en'},
@@ -85,77 +80,95 @@ def create_response(message, data=None, status=200, error=None):
     return jsonify(response_data), status
 
 # Helper Functions
+# Fields and horizon format_weather_response shows
+WEATHER_PARAMS = {
+    'current': 'temperature_2m,relative_humidity_2m,apparent_temperature,wind_speed_10m',
+    'daily': 'temperature_2m_max,temperature_2m_min',
+    'timezone': 'Asia/Kolkata',
+    'forecast_days': 1
+}
+
 def get_weather_data(lat, lon):
-    """Fetch weather data from Open-Meteo API"""
-    base_url = "https://api.open-meteo.com/v1/forecast"
-    params = {
-        'latitude': lat,
-        'longitude': lon,
-        'current': 'temperature_2m,relative_humidity_2m,apparent_temperature,precipitation,weather_code,wind_speed_10m',
-        'daily': 'weather_code,temperature_2m_max,temperature_2m_min,precipitation_sum,precipitation_probability_max',
-        'timezone': 'Asia/Kolkata',
-        'forecast_days': 7
-    }
-    
+    """Fetch weather data from Open-Meteo API
+
+    Returns (Forecast, stale_age); stale_age is the age in seconds of cached data
+    served because the forecast expired or Open-Meteo is unavailable.
+    """
     try:
-        response = requests.get(base_url, params=params, timeout=10)
-        response.raise_for_status()
-        return response.json()
+        return open_meteo.fetch_forecast(lat, lon, WEATHER_PARAMS)
     except requests.exceptions.Timeout:
         print("Weather API request timed out")
-        return None
+        return None, None
     except requests.exceptions.RequestException as e:
         print(f"Error fetching weather data: {e}")
-        return None
+        return None, None
     except Exception as e:
         print(f"Unexpected error in weather API: {e}")
-        return None
+        return None, None
+
+prewarmer = ForecastPrewarmer.from_catalog({"Gujarat": GUJARAT_DISTRICTS}, WEATHER_PARAMS)
+location_index = LocationIndex.from_catalog({"Gujarat": GUJARAT_DISTRICTS})
 
-def format_weather_response(data, district):
-    """Format weather data into readable response"""
+def format_weather_response(data, district, language='en', stale_age=None):
+    """Format weather data into readable response in the given language"""
+    t = catalogs.get(language)
     if not data:
-        return "Sorry, couldn't fetch weather data."
+        return t.text('fetch_failed')
     
-    current = data.get('current', {})
-    daily = data.get('daily', {})
+    current = data.current
+    daily = data.daily
     
-    response = f"Weather in {district}, Gujarat:\n"
-    response += f"Temperature: {current.get('temperature_2m', 'N/A')}°C\n"
-    response += f"Feels like: {current.get('apparent_temperature', 'N/A')}°C\n"
-    response += f"Humidity: {current.get('relative_humidity_2m', 'N/A')}%\n"
-    response += f"Wind Speed: {current.get('wind_speed_10m', 'N/A')} km/h\n"
+    response = ""
+    if stale_age is not None:
+        response += f"{t.text('stale_notice', round(stale_age / 60))}\n"
+    
+    place = f"{t.name(district)}, {t.name('Gujarat')}"
+    response += f"{t.text('weather_in', place)}\n"
+    response += f"{t.text('temperature')}: {current.get('temperature_2m', 'N/A')}°C\n"
+    response += f"{t.text('feels_like')}: {current.get('apparent_temperature', 'N/A')}°C\n"
+    response += f"{t.text('humidity')}: {current.get('relative_humidity_2m', 'N/A')}%\n"
+    response += f"{t.text('wind_speed')}: {current.get('wind_speed_10m', 'N/A')} km/h\n"
     
     if daily.get('temperature_2m_max') and daily.get('temperature_2m_min'):
-        response += f"Today's Range: {daily['temperature_2m_min'][0]}°C - {daily['temperature_2m_max'][0]}°C\n"
+        response += f"{t.text('todays_range')}: {daily['temperature_2m_min'][0]}°C - {daily['temperature_2m_max'][0]}°C\n"
     
     return response
 
-def get_commodity_prices_internal(district, date_str, language):
-    """Internal function to handle commodity prices logic"""
-    base_url = "https://api.data.gov.in/resource/35985678-0d79-46b4-9ed6-6f13308a1d24"
-    params = {
-        "api-key": "579b464db66ec23bdd000001cdd3946e44ce4aad7209ff7b23ac571b",
-        "format": "json",
-        "filters[State]": "Gujarat",
-        "limit": "100"
-    }
+# Streamed /get_commodity_prices responses: one JSON record per line
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+def commodity_filters(district, date_str):
+    """data.gov.in filter params for a Gujarat query, and the date as ISO (or None)"""
+    params = {"filters[State]": "Gujarat"}
     
     if district:
         params["filters[District]"] = district
     
+    iso_date = None
     if date_str:
         try:
             date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-            formatted_date = date_obj.strftime('%d/%m/%Y')
-            params["filters[Arrival_Date]"] = formatted_date
+            params["filters[Arrival_Date]"] = date_obj.strftime('%d/%m/%Y')
+            iso_date = date_obj.strftime('%Y-%m-%d')
         except ValueError:
             pass
     
+    return params, iso_date
+
+def get_commodity_prices_internal(district, date_str, language):
+    """Internal function to handle commodity prices logic"""
+    params, iso_date = commodity_filters(district, date_str)
+    
     try:
-        response = requests.get(base_url, params=params)
-        response.raise_for_status()
-        api_data = response.json()
-        records = api_data.get('records', [])
+        if commodity_store.is_fresh("Gujarat"):
+            # Answered from a recent ingest: complete result sets, no upstream call
+            records = commodity_store.query("Gujarat", district or None, iso_date)
+        else:
+            # Identical concurrent queries share one paged data.gov.in fetch
+            records = singleflight.commodity_flights.do(tuple(sorted(params.items())), fetch_commodity_records, params)
+            if iso_date is None:
+                # Without a date the store answers with the latest arrivals; so does the live path
+                records = latest_arrivals(records)
         
         if not records:
             return create_response(
@@ -185,6 +198,50 @@ def get_commodity_prices_internal(district, date_str, language):
             status=500
         )
 
+def iter_commodity_records(district, date_str):
+    """Yield every matching record, from the store or page by page from data.gov.in"""
+    params, iso_date = commodity_filters(district, date_str)
+    if commodity_store.is_fresh("Gujarat"):
+        yield from commodity_store.query("Gujarat", district or None, iso_date)
+    elif iso_date:
+        yield from iter_records(live_page, params)
+    else:
+        # The latest arrival date is only known once every page is in
+        yield from latest_arrivals(iter_records(live_page, params))
+
+def fetch_commodity_records(params):
+    """Fetch all commodity price records matching params from data.gov.in"""
+    return list(iter_records(live_page, params))
+
+def stream_commodity_prices(district, date_str):
+    """Stream matching records as NDJSON, one record per line, as pages arrive"""
+    try:
+        records = iter_commodity_records(district, date_str)
+        # Pull the first record now so upstream failures still get a proper error response
+        first = next(records, None)
+    except Exception as e:
+        return create_response(
+            "Failed to retrieve commodity prices", 
+            error=f"Error fetching commodity data: {e}", 
+            status=500
+        )
+    
+    def generate():
+        if first is None:
+            return
+        yield json.dumps(first, ensure_ascii=False) + "\n"
+        try:
+            for record in records:
+                yield json.dumps(record, ensure_ascii=False) + "\n"
+        except Exception as e:
+            print(f"Error streaming commodity prices: {e}")
+            # Headers are already sent; the last line tells the client the result is incomplete
+            yield json.dumps({"error": f"Error fetching commodity data: {e}"}) + "\n"
+        finally:
+            records.close()
+    
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE, headers={'X-Accel-Buffering': 'no'})
+
 def format_commodity_response(records, district, date):
     """Format commodity data into readable response"""
     if not records:
@@ -244,28 +301,43 @@ def translate_text(text, target_language):
         }
         
         target_lang = language_map.get(target_language, target_language)
-        translator = GoogleTranslator(source='english', target=target_lang)
-        
-        return translator.translate(text)
+        # Only lines missing from the translation cache reach Google Translate
+        return translate_segments(text, target_language, partial(google_translate, target_lang=target_lang))
     except Exception as e:
         print(f"Translation error: {e}")
         return text
 
+def google_translate(text, target_lang):
+    """Translate English text with Google Translate, chunking long inputs"""
+    return translate_chunked(text, partial(translate_chunk, target_lang=target_lang))
+
+def translate_chunk(text, target_lang):
+    """Translate a single chunk of at most 4500 characters"""
+    # GoogleTranslator keeps per-request state, so parallel chunks each get their own
+    translator = GoogleTranslator(source='english', target=target_lang)
+    return translator.translate(text)
+
+# Weather phrases and district names, translated once per language
+catalogs = CatalogStore(translate_text, names=["Gujarat"] + list(GUJARAT_DISTRICTS))
+
 def extract_location_from_command(command):
     """Extract location information from voice command"""
-    for district in GUJARAT_DISTRICTS:
-        if district.lower() in command.lower():
-            return {
-                'district': district
-            }
+    district = find_district(command, GUJARAT_DISTRICTS)
+    if district:
+        return {
+            'district': district
+        }
     return None
 
 def extract_commodity_info_from_command(command):
     """Extract district from commodity command"""
-    for district in GUJARAT_DISTRICTS:
-        if district.lower() in command.lower():
-            return district
-    return None
+    return find_district(command, GUJARAT_DISTRICTS)
+
+@app.before_request
+def reject_oversized_upload():
+    # Checked up front so routes' broad exception handlers do not turn it into a 500
+    if request.content_length and request.content_length > MAX_AUDIO_UPLOAD_BYTES:
+        return create_response("Request too large", error=f"Request body exceeds {MAX_AUDIO_UPLOAD_BYTES} bytes", status=413)
 
 # Main Routes
 @app.route('/')
@@ -282,27 +354,26 @@ def process_text():
     if not text:
         return create_response("Failed to process text", error="No text provided", status=400)
     
+    intent = classify_intent(text)
     # Check if text is about weather
-    if any(word in text for word in ['weather', 'temperature', 'rain', 'forecast', 'climate']):
+    if intent.name == WEATHER:
         location_info = extract_location_from_command(text)
         if location_info:
             district = location_info['district']
             coords = GUJARAT_DISTRICTS[district]
-            weather_data = get_weather_data(coords['lat'], coords['lon'])
+            weather_data, stale_age = get_weather_data(coords['lat'], coords['lon'])
             if weather_data:
-                response = format_weather_response(weather_data, district)
+                # Already localized, so skip the translation step below
+                response = format_weather_response(weather_data, district, language, stale_age)
+                return create_response("Text processed successfully", data={"response": response}, status=200)
             else:
                 return create_response("Failed to process text", error="Couldn't fetch weather data", status=500)
         else:
             return create_response("Failed to process text", error="Please specify a Gujarat district for weather information", status=400)
     
     # Check if text is about commodity prices
-    elif any(word in text for word in ['price', 'commodity', 'market', 'cost', 'rate']):
-        district = None
-        for d in GUJARAT_DISTRICTS:
-            if d.lower() in text:
-                district = d
-                break
+    elif intent.name == COMMODITY:
+        district = extract_commodity_info_from_command(text)
         
         date_str = None  # Could implement date extraction here
         
@@ -334,20 +405,43 @@ def get_weather():
     if not location:
         return create_response("Failed to retrieve weather data", error="District not found in Gujarat", status=404)
     
-    weather_data = get_weather_data(location['lat'], location['lon'])
+    weather_data, stale_age = get_weather_data(location['lat'], location['lon'])
     
     if not weather_data:
         return create_response("Failed to retrieve weather data", error="Failed to fetch weather data", status=500)
     
-    response = format_weather_response(weather_data, district)
+    response = format_weather_response(weather_data, district, language, stale_age)
     
-    if language != 'en':
-        try:
-            response = translate_text(response, language)
-        except Exception as e:
-            print(f"Translation failed: {e}")
+    data = {"response": response, "stale": stale_age is not None}
+    if stale_age is not None:
+        data["data_age_seconds"] = int(stale_age)
+    return create_response("Weather data retrieved successfully", data=data, status=200)
+
+@app.route('/get_weather_by_coords', methods=['GET', 'POST'])
+def get_weather_by_coords():
+    data = request.get_json(silent=True) or request.args
+    language = data.get('language', 'en')
     
-    return create_response("Weather data retrieved successfully", data={"response": response}, status=200)
+    coords = parse_coords(data)
+    if not coords:
+        return create_response("Failed to retrieve weather data", error="Please provide valid lat and lon", status=400)
+    
+    # Resolve to the nearest district so its cached forecast is reused
+    _, district, district_lat, district_lon, distance_km = location_index.nearest(*coords)
+    if distance_km > NEAREST_MAX_KM:
+        return create_response("Failed to retrieve weather data", error="No Gujarat district near these coordinates", status=404)
+    
+    weather_data, stale_age = get_weather_data(district_lat, district_lon)
+    
+    if not weather_data:
+        return create_response("Failed to retrieve weather data", error="Failed to fetch weather data", status=500)
+    
+    response = format_weather_response(weather_data, district, language, stale_age)
+    
+    data = {"response": response, "district": district, "distance_km": round(distance_km, 1), "stale": stale_age is not None}
+    if stale_age is not None:
+        data["data_age_seconds"] = int(stale_age)
+    return create_response("Weather data retrieved successfully", data=data, status=200)
 
 @app.route('/get_commodity_prices', methods=['POST'])
 def get_commodity_prices():
@@ -356,8 +450,63 @@ def get_commodity_prices():
     date_str = data.get('date', '')
     language = data.get('language', 'en')
     
+    # {"format": "ndjson"} or Accept: application/x-ndjson streams the raw records instead
+    if data.get('format') == 'ndjson' or request.accept_mimetypes.best == NDJSON_MIMETYPE:
+        return stream_commodity_prices(district, date_str)
+    
     return get_commodity_prices_internal(district, date_str, language)
 
+@app.route('/commodity_analytics', methods=['GET', 'POST'])
+def commodity_analytics():
+    """Per-commodity price statistics for a Gujarat district, or all of Gujarat, over a date range.
+
+    Takes district, start and end (YYYY-MM-DD) as JSON or query parameters;
+    end defaults to the latest arrivals and start to COMMODITY_ANALYTICS_DAYS
+    before it.
+    """
+    data = request.get_json(silent=True) or request.args
+    district = data.get('district', '')
+    try:
+        start, end = (datetime.strptime(data[key], '%Y-%m-%d').date() if data.get(key) else None
+                      for key in ('start', 'end'))
+    except (TypeError, ValueError):
+        # TypeError: a JSON number or list where a date string belongs
+        return create_response("Failed to compute commodity analytics", error="Dates must be YYYY-MM-DD", status=400)
+    if start and end and start > end:
+        return create_response("Failed to compute commodity analytics", error="start is after end", status=400)
+    
+    try:
+        from_store = commodity_store.has_data("Gujarat")
+        if from_store:
+            latest = commodity_store.latest_date("Gujarat", district or None)
+            end = end or (datetime.strptime(latest, '%Y-%m-%d').date() if latest else datetime.now().date())
+        else:
+            end = end or datetime.now().date()
+        start = start or end - timedelta(days=COMMODITY_ANALYTICS_DAYS - 1)
+        
+        key = (district, start.isoformat(), end.isoformat(), commodity_store.version() if from_store else None)
+        result = analytics_cache.get(key)
+        if result is None:
+            if from_store:
+                rows = commodity_store.price_rows("Gujarat", district or None, start.isoformat(), end.isoformat())
+            else:
+                # Without an ingest only the resource's current arrivals are available
+                params, _ = commodity_filters(district, None)
+                records = singleflight.commodity_flights.do(tuple(sorted(params.items())), fetch_commodity_records, params)
+                rows = [row[1:4] + row[6:] for row in map(to_row, records)
+                        if row is not None and start.isoformat() <= row[6] <= end.isoformat()]
+            result = analyze(rows)
+            analytics_cache.set(key, result)
+    except Exception as e:
+        return create_response(
+            "Failed to compute commodity analytics", 
+            error=f"Error fetching commodity data: {e}", 
+            status=500
+        )
+    
+    data = dict(result, district=district or None, start=start.isoformat(), end=end.isoformat())
+    return create_response("Commodity analytics computed successfully", data=data, status=200)
+
 @app.route('/chat', methods=['POST'])
 def chat():
     data = request.json
@@ -390,22 +539,12 @@ def speech_to_text():
         audio_file = request.files['audio']
         language = request.json.get('language', 'en') if request.is_json else request.form.get('language', 'en')
         
-        # Save uploaded audio to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-            audio_file.save(tmp_file.name)
-            
-            # Use speech recognition
-            with sr.AudioFile(tmp_file.name) as source:
-                audio_data = recognizer.record(source)
-                
-            sr_language = SUPPORTED_LANGUAGES.get(language, {}).get('sr_lang', 'en-IN')
-            text = recognizer.recognize_google(audio_data, language=sr_language)
-            
-            # Clean up temp file
-            os.unlink(tmp_file.name)
-            
-            return create_response("Speech converted to text successfully", data={"text": text}, status=200)
+        text = recognize_speech(audio_file, language)
+        
+        return create_response("Speech converted to text successfully", data={"text": text}, status=200)
             
+    except AudioPoolBusy:
+        return busy_response("Failed to convert speech to text")
     except sr.UnknownValueError:
         return create_response("Failed to convert speech to text", error="Could not understand audio", status=400)
     except sr.RequestError as e:
@@ -426,30 +565,45 @@ def text_to_speech():
         # Get the language code for gTTS
         tts_lang = SUPPORTED_LANGUAGES.get(language, {}).get('tts_lang', 'en')
         
-        # Create gTTS object
-        tts = gTTS(text=text, lang=tts_lang, slow=False)
+        # Repeated phrases are served from the speech cache without calling gTTS
+        key = tts_cache.get_or_create(text, tts_lang, synthesize_speech)
         
-        # Save to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as tmp_file:
-            tts.save(tmp_file.name)
-            
-            # Read the generated audio file
-            with open(tmp_file.name, 'rb') as audio_file:
-                audio_data = audio_file.read()
-                audio_base64 = base64.b64encode(audio_data).decode('utf-8')
-            
-            # Clean up temp file
-            os.unlink(tmp_file.name)
-            
-            return create_response(
-                "Text converted to speech successfully", 
-                data={"audio": audio_base64, "format": "mp3"}, 
-                status=200
-            )
+        return create_response(
+            "Text converted to speech successfully", 
+            data={"audio_url": url_for('get_audio', key=key, _external=True), "format": "mp3"}, 
+            status=200
+        )
             
     except Exception as e:
         return create_response("Failed to convert text to speech", error=f"Error generating speech: {e}", status=500)
 
+# Sentence ends and line breaks; weather replies put one fact per line
+SPEECH_BOUNDARY = re.compile(r'(?<=[.!?।])\s+|\n+')
+# Later segments are grouped up to this many characters per gTTS call
+TTS_SEGMENT_CHARS = int(os.environ.get('TTS_SEGMENT_CHARS', 200))
+# Parallel gTTS calls for streamed replies
+TTS_STREAM_WORKERS = int(os.environ.get('TTS_STREAM_WORKERS', 3))
+tts_executor = ThreadPoolExecutor(max_workers=TTS_STREAM_WORKERS, thread_name_prefix='tts')
+
+def synthesize_speech(text, tts_lang):
+    """Render text to mp3 bytes with gTTS"""
+    buffer = io.BytesIO()
+    gTTS(text=text, lang=tts_lang, slow=False).write_to_fp(buffer)
+    return buffer.getvalue()
+
+@app.route('/audio/<key>.mp3', methods=['GET'])
+def get_audio(key):
+    """Serve cached speech; content-addressed, so it never changes once written"""
+    path = tts_cache.get(key) if KEY_PATTERN.match(key) else None
+    if not path:
+        return create_response("Failed to retrieve audio", error="Audio not found", status=404)
+    
+    # conditional=True answers If-None-Match / If-Modified-Since and Range requests
+    response = send_file(path, mimetype='audio/mpeg', conditional=True, etag=key, max_age=TTS_AUDIO_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
 @app.route('/process_voice_command', methods=['POST'])
 def process_voice_command():
     data = request.json
@@ -460,21 +614,24 @@ def process_voice_command():
         return create_response("Failed to process voice command", error="No command provided", status=400)
     
     # Analyze the command to determine intent
-    if any(word in command for word in ['weather', 'temperature', 'rain', 'forecast']):
+    intent = classify_intent(command)
+    if intent.name == WEATHER:
         # Extract location from command
         location_info = extract_location_from_command(command)
         if location_info:
             district = location_info['district']
             coords = GUJARAT_DISTRICTS[district]
-            weather_data = get_weather_data(coords['lat'], coords['lon'])
+            weather_data, stale_age = get_weather_data(coords['lat'], coords['lon'])
             if weather_data:
-                response = format_weather_response(weather_data, district)
+                # Already localized, so skip the translation step below
+                response = format_weather_response(weather_data, district, language, stale_age)
+                return create_response("Voice command processed successfully", data={"response": response}, status=200)
             else:
                 return create_response("Failed to process voice command", error="Couldn't fetch weather data", status=500)
         else:
             return create_response("Failed to process voice command", error="Please specify a Gujarat district for weather information", status=400)
     
-    elif any(word in command for word in ['price', 'commodity', 'market', 'cost']):
+    elif intent.name == COMMODITY:
         # Extract commodity/location info
         district = extract_commodity_info_from_command(command)
         if district:
@@ -492,6 +649,64 @@ def process_voice_command():
     return create_response("Voice command processed successfully", data={"response": response}, status=200)
 
 # Voice-specific endpoints
+def recognize_speech(audio_file, language):
+    """Transcribe an uploaded audio file with Google speech recognition.
+
+    Decoding runs in the audio pool; raises AudioPoolBusy when it is saturated.
+    """
+    frame_data, sample_rate, sample_width = audio_pool.run(decode_wav, audio_file.stream.getvalue())
+    audio_data = sr.AudioData(frame_data, sample_rate, sample_width)
+    
+    sr_language = SUPPORTED_LANGUAGES.get(language, {}).get('sr_lang', 'en-IN')
+    return recognizer.recognize_google(audio_data, language=sr_language)
+
+def busy_response(message):
+    """503 telling clients to retry shortly while the audio pool is saturated"""
+    response, status = create_response(message, error="Voice service is busy, please retry shortly", status=503)
+    response.headers['Retry-After'] = str(AUDIO_RETRY_AFTER)
+    return response, status
+
+def answer_voice_text(text, language):
+    """Build the spoken reply for recognized text, or None if weather data could not be fetched"""
+    localized = False
+    intent = classify_intent(text)
+    # Check if text is about weather
+    if intent.name == WEATHER:
+        location_info = extract_location_from_command(text)
+        if location_info:
+            district = location_info['district']
+            coords = GUJARAT_DISTRICTS[district]
+            weather_data, stale_age = get_weather_data(coords['lat'], coords['lon'])
+            if not weather_data:
+                return None
+            response_text = format_weather_response(weather_data, district, language, stale_age)
+            localized = True
+        else:
+            response_text = "Please specify a Gujarat district for weather information."
+    
+    # Check if text is about commodity prices
+    elif intent.name == COMMODITY:
+        district = extract_commodity_info_from_command(text)
+        
+        if district:
+            commodity_response, status_code = get_commodity_prices_internal(district, None, language)
+            response_text = commodity_response.json.get('data', {}).get('response', "No commodity price data found.")
+        else:
+            response_text = "Please specify a Gujarat district for commodity prices."
+    
+    # Otherwise, general chat
+    else:
+        response_text = get_claude_response(text)
+    
+    # Translate response if needed (to match input language)
+    if language != 'en' and not localized:
+        try:
+            response_text = translate_text(response_text, language)
+        except Exception as e:
+            print(f"Translation failed: {e}")
+    
+    return response_text
+
 @app.route('/voice_interaction', methods=['POST'])
 def voice_interaction():
     """Combined endpoint that handles both speech-to-text and text-to-speech"""
@@ -503,93 +718,137 @@ def voice_interaction():
         language = request.json.get('language', 'en') if request.is_json else request.form.get('language', 'en')
         
         # 1. Speech to Text
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp_file:
-            audio_file.save(tmp_file.name)
-            
-            with sr.AudioFile(tmp_file.name) as source:
-                audio_data = recognizer.record(source)
-                
-            sr_language = SUPPORTED_LANGUAGES.get(language, {}).get('sr_lang', 'en-IN')
-            text = recognizer.recognize_google(audio_data, language=sr_language)
-            
-            os.unlink(tmp_file.name)
+        text = recognize_speech(audio_file, language)
         
         # 2. Process the text
-        # Check if text is about weather
-        if any(word in text.lower() for word in ['weather', 'temperature', 'rain', 'forecast', 'climate']):
-            location_info = extract_location_from_command(text)
-            if location_info:
-                district = location_info['district']
-                coords = GUJARAT_DISTRICTS[district]
-                weather_data = get_weather_data(coords['lat'], coords['lon'])
-                if weather_data:
-                    response_text = format_weather_response(weather_data, district)
-                else:
-                    return create_response("Failed to process voice interaction", error="Couldn't fetch weather data", status=500)
-            else:
-                response_text = "Please specify a Gujarat district for weather information."
+        response_text = answer_voice_text(text, language)
+        if response_text is None:
+            return create_response("Failed to process voice interaction", error="Couldn't fetch weather data", status=500)
         
-        # Check if text is about commodity prices
-        elif any(word in text.lower() for word in ['price', 'commodity', 'market', 'cost', 'rate']):
-            district = None
-            for d in GUJARAT_DISTRICTS:
-                if d.lower() in text.lower():
-                    district = d
-                    break
-            
-            if district:
-                commodity_response, status_code = get_commodity_prices_internal(district, None, language)
-                response_text = commodity_response.json.get('data', {}).get('response', "No commodity price data found.")
-            else:
-                response_text = "Please specify a Gujarat district for commodity prices."
-        
-        # Otherwise, general chat
-        else:
-            response_text = get_claude_response(text)
-        
-        # 3. Translate response if needed (to match input language)
-        if language != 'en':
-            try:
-                response_text = translate_text(response_text, language)
-            except Exception as e:
-                print(f"Translation failed: {e}")
-        
-        # 4. Convert response to speech
+        # 3. Convert response to speech
         tts_lang = SUPPORTED_LANGUAGES.get(language, {}).get('tts_lang', 'en')
-        tts = gTTS(text=response_text, lang=tts_lang, slow=False)
-        
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as tmp_file:
-            tts.save(tmp_file.name)
-            
-            with open(tmp_file.name, 'rb') as audio_file:
-                audio_data = audio_file.read()
-                audio_base64 = base64.b64encode(audio_data).decode('utf-8')
-            
-            os.unlink(tmp_file.name)
+        key = tts_cache.get_or_create(response_text, tts_lang, synthesize_speech)
         
-        # 5. Return both the text and speech
+        # 4. Return both the text and speech
         return create_response(
             "Voice interaction processed successfully", 
             data={
                 "recognized_text": text,
                 "response_text": response_text,
-                "audio": audio_base64,
+                "audio_url": url_for('get_audio', key=key, _external=True),
                 "format": "mp3"
             }, 
             status=200
         )
             
+    except AudioPoolBusy:
+        return busy_response("Failed to process voice interaction")
+    except sr.UnknownValueError:
+        return create_response("Failed to process voice interaction", error="Could not understand audio", status=400)
+    except sr.RequestError as e:
+        return create_response("Failed to process voice interaction", error=f"Speech recognition service error: {e}", status=500)
+    except Exception as e:
+        return create_response("Failed to process voice interaction", error=f"Error processing voice interaction: {e}", status=500)
+
+def speech_segments(text, limit=TTS_SEGMENT_CHARS):
+    """Split a reply into sentence-aligned segments for progressive synthesis.
+
+    The first sentence is its own segment so playback starts as early as
+    possible; later sentences are grouped up to limit characters to keep
+    the number of gTTS calls down.
+    """
+    sentences = [sentence.strip() for sentence in SPEECH_BOUNDARY.split(text) if sentence.strip()]
+    segments = sentences[:1]
+    for sentence in sentences[1:]:
+        if len(segments) > 1 and len(segments[-1]) + len(sentence) < limit:
+            # A line break keeps the pause between grouped lines
+            segments[-1] += '\n' + sentence
+        else:
+            segments.append(sentence)
+    return segments
+
+def sse_event(data, event=None):
+    """Encode one Server-Sent Events frame"""
+    frame = f"event: {event}\n" if event else ""
+    return frame + f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@app.route('/voice_interaction/stream', methods=['POST'])
+def voice_interaction_stream():
+    """Like /voice_interaction, but streams the reply's audio sentence by sentence over SSE.
+
+    Events: 'transcript' and 'reply' with the texts, one 'audio' per segment
+    in order ({index, text, audio_url}), then 'done' or 'error'.
+    """
+    try:
+        if 'audio' not in request.files:
+            return create_response("Failed to process voice interaction", error="No audio file provided", status=400)
+        
+        audio_file = request.files['audio']
+        language = request.form.get('language', 'en')
+        
+        text = recognize_speech(audio_file, language)
+        response_text = answer_voice_text(text, language)
+        if response_text is None:
+            return create_response("Failed to process voice interaction", error="Couldn't fetch weather data", status=500)
+    except AudioPoolBusy:
+        return busy_response("Failed to process voice interaction")
     except sr.UnknownValueError:
         return create_response("Failed to process voice interaction", error="Could not understand audio", status=400)
     except sr.RequestError as e:
         return create_response("Failed to process voice interaction", error=f"Speech recognition service error: {e}", status=500)
     except Exception as e:
         return create_response("Failed to process voice interaction", error=f"Error processing voice interaction: {e}", status=500)
+    
+    tts_lang = SUPPORTED_LANGUAGES.get(language, {}).get('tts_lang', 'en')
+    segments = speech_segments(response_text)
+    # Every segment is queued at once; events still go out in reply order
+    futures = [tts_executor.submit(tts_cache.get_or_create, segment, tts_lang, synthesize_speech)
+               for segment in segments]
+    
+    def generate():
+        try:
+            yield sse_event({'text': text}, event='transcript')
+            yield sse_event({'text': response_text}, event='reply')
+            for index, (segment, future) in enumerate(zip(segments, futures)):
+                key = future.result()
+                yield sse_event({'index': index, 'text': segment, 'audio_url': url_for('get_audio', key=key, _external=True)}, event='audio')
+            yield sse_event({'segments': len(segments), 'format': 'mp3'}, event='done')
+        except Exception as e:
+            print(f"Error streaming speech: {e}")
+            yield sse_event({'error': f"Error generating speech: {e}"}, event='error')
+        finally:
+            for future in futures:
+                future.cancel()
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/prewarm_status', methods=['GET'])
+def prewarm_status():
+    return create_response("Prewarm status retrieved successfully", data=prewarmer.status(), status=200)
 
 # Add a health check endpoint
 @app.route('/health', methods=['GET'])
 def health_check():
-    return create_response("Service is healthy", data={"status": "UP"}, status=200)
+    return create_response(
+        "Service is healthy", 
+        data={
+            "status": "UP",
+            "forecast_cache": forecast_cache.stats(),
+            "translation_cache": translation_cache.stats(),
+            "tts_cache": tts_cache.stats(),
+            "audio_pool": audio_pool.stats(),
+            "commodity_store": commodity_store.stats(),
+            "commodity_analytics_cache": analytics_cache.stats(),
+            "singleflight": singleflight.stats(),
+            "http_encoding": http_encoding.stats(),
+            "upstreams": upstream.breaker_stats()
+        }, 
+        status=200
+    )
 
 @app.route('/', methods=['GET'])
 def root():
@@ -602,12 +861,17 @@ def root():
                 "/health",
                 "/process_text",
                 "/get_weather",
+                "/get_weather_by_coords",
                 "/get_commodity_prices",
+                "/commodity_analytics",
                 "/chat",
                 "/speech_to_text",
                 "/text_to_speech",
+                "/audio/<key>.mp3",
                 "/process_voice_command",
-                "/voice_interaction"
+                "/voice_interaction",
+                "/voice_interaction/stream",
+                "/prewarm_status"
             ]
         }, 
         status=200
@@ -618,4 +882,8 @@ if __name__ == '__main__':
     print("Supported Languages: English, Hindi, Gujarati")
     print("Access at: http://localhost:5000\n")
     
+    # With the debug reloader only the child process serves requests
+    if PREWARM_ENABLED and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        prewarmer.start()
+    
     app.run(host='0.0.0.0', debug=True, port=5000)
\ No newline at end of file
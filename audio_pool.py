@@ -0,0 +1,140 @@
+"""CPU-bound audio work in a small process pool, off the request threads.
+
+Decoding and sample conversion hold the GIL; running them in worker
+processes keeps the JSON endpoints responsive while voice uploads spike.
+The number of jobs running or queued is capped, and callers get
+AudioPoolBusy immediately once the cap is reached instead of piling up.
+
+Under serve_async.py the jobs run on gevent's native thread pool instead:
+multiprocessing talks to its workers over blocking pipes, which would
+stall the whole event loop once monkey-patched.
+"""
+import multiprocessing
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+AUDIO_WORKERS = int(os.environ.get('AUDIO_WORKERS', 2))
+# Jobs running or waiting before new ones are rejected
+AUDIO_QUEUE_DEPTH = int(os.environ.get('AUDIO_QUEUE_DEPTH', 8))
+AUDIO_JOB_TIMEOUT = float(os.environ.get('AUDIO_JOB_TIMEOUT', 30))
+
+
+def _gevent_patched():
+    monkey = sys.modules.get('gevent.monkey')
+    return monkey is not None and monkey.is_module_patched('threading')
+
+
+class AudioPoolBusy(Exception):
+    """Raised when the audio pool already has AUDIO_QUEUE_DEPTH jobs"""
+
+
+def decode_wav(data):
+    """Read a WAV/AIFF/FLAC upload into 16-bit PCM; returns (frame_data, sample_rate, sample_width)"""
+    import io
+    import speech_recognition as sr
+
+    with sr.AudioFile(io.BytesIO(data)) as source:
+        audio = sr.Recognizer().record(source)
+    # recognize_google converts to 16-bit anyway; doing it here keeps that work off the server too
+    return audio.get_raw_data(convert_width=2), audio.sample_rate, 2
+
+
+class AudioPool:
+    """Bounded ProcessPoolExecutor with fast rejection"""
+
+    def __init__(self, workers=AUDIO_WORKERS, max_pending=AUDIO_QUEUE_DEPTH, timeout=AUDIO_JOB_TIMEOUT):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None and _gevent_patched():
+                from gevent.threadpool import ThreadPoolExecutor
+                self._executor = ThreadPoolExecutor(max_workers=self.workers)
+            elif self._executor is None:
+                # spawn: forking a multi-threaded server is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def _reset(self, executor):
+        """Drop a broken pool so the next job starts a fresh one"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, fn, *args):
+        """Return (executor, future) for fn(*args)"""
+        executor = self._pool()
+        try:
+            return executor, executor.submit(fn, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed) and took the pool with it; retry once on a new one
+            print("Audio pool is broken, restarting it")
+            self._reset(executor)
+            executor = self._pool()
+            return executor, executor.submit(fn, *args)
+
+    def run(self, fn, *args):
+        """Run fn(*args) in a worker process and return its result.
+
+        Raises AudioPoolBusy without waiting if the pool is saturated.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise AudioPoolBusy(f"Audio pool is busy ({self.max_pending} jobs pending)")
+
+        with self._lock:
+            self.pending += 1
+        try:
+            executor, future = self._submit(fn, *args)
+        except BaseException:
+            self._finished(None)
+            raise
+        # The slot is held until the worker is done, even if this caller stops waiting
+        future.add_done_callback(self._finished)
+        try:
+            return future.result(timeout=self.timeout)
+        except BrokenProcessPool:
+            # This job is lost, but the jobs after it get a working pool
+            print("Audio worker died, restarting the pool")
+            self._reset(executor)
+            raise
+
+    def _finished(self, future):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+        self._slots.release()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'max_pending': self.max_pending,
+                'pending': self.pending,
+                'completed': self.completed,
+                'rejected': self.rejected
+            }
+
+
+audio_pool = AudioPool()
@@ -0,0 +1,98 @@
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+# Google Translate rejects requests over 5000 characters
+TRANSLATE_CHUNK_CHARS = int(os.environ.get('TRANSLATE_CHUNK_CHARS', 4500))
+TRANSLATE_WORKERS = int(os.environ.get('TRANSLATE_WORKERS', 4))
+TRANSLATE_CHUNK_TIMEOUT = float(os.environ.get('TRANSLATE_CHUNK_TIMEOUT', 10))
+
+_SENTENCE_END = re.compile(r'(?<=[.!?।])\s+')
+
+_executor = ThreadPoolExecutor(max_workers=TRANSLATE_WORKERS, thread_name_prefix='translate')
+
+
+def _split_long(piece, limit):
+    """Split a single over-long line at sentence, then word, then character boundaries"""
+    parts = []
+    current = ''
+    for sentence in _SENTENCE_END.split(piece):
+        for unit in ([sentence] if len(sentence) <= limit else sentence.split(' ')):
+            if len(unit) > limit and current:
+                # Flush what came before, so the hard-split pieces stay in order
+                parts.append(current)
+                current = ''
+            while len(unit) > limit:
+                parts.append(unit[:limit])
+                unit = unit[limit:]
+            candidate = f"{current} {unit}" if current else unit
+            if len(candidate) <= limit:
+                current = candidate
+            else:
+                parts.append(current)
+                current = unit
+    if current:
+        parts.append(current)
+    return parts
+
+
+def split_text(text, limit=TRANSLATE_CHUNK_CHARS):
+    """Split text into chunks of at most limit characters without breaking lines.
+
+    Returns (chunk, separator) pairs where separator is the text that joined
+    the chunk to the next one, so the original layout can be rebuilt.
+    """
+    chunks = []
+    current = []
+    size = 0
+    for line in text.split('\n'):
+        if len(line) > limit:
+            if current:
+                chunks.append(('\n'.join(current), '\n'))
+                current, size = [], 0
+            pieces = _split_long(line, limit)
+            chunks.extend((piece, ' ') for piece in pieces[:-1])
+            chunks.append((pieces[-1], '\n'))
+            continue
+
+        added = len(line) + (1 if current else 0)
+        if current and size + added > limit:
+            chunks.append(('\n'.join(current), '\n'))
+            current, size = [], 0
+            added = len(line)
+        current.append(line)
+        size += added
+
+    if current or not chunks:
+        chunks.append(('\n'.join(current), '\n'))
+
+    last_chunk, _ = chunks[-1]
+    chunks[-1] = (last_chunk, '')
+    return chunks
+
+
+def translate_chunked(text, translate, limit=TRANSLATE_CHUNK_CHARS, timeout=TRANSLATE_CHUNK_TIMEOUT):
+    """Translate text chunk by chunk on the shared pool and reassemble it in order.
+
+    A chunk that fails or exceeds timeout is returned untranslated.
+    """
+    chunks = split_text(text, limit)
+    # A single chunk takes the same path, so it gets the same deadline and fallback
+    futures = [_executor.submit(translate, chunk) if chunk.strip() else None for chunk, _ in chunks]
+    # Chunks beyond the pool size queue behind earlier ones, so budget one timeout per round
+    rounds = -(-len(futures) // TRANSLATE_WORKERS)
+    deadline = time.monotonic() + timeout * rounds
+
+    output = []
+    for (chunk, separator), future in zip(chunks, futures):
+        translated = chunk
+        if future is not None:
+            try:
+                translated = future.result(timeout=max(0, deadline - time.monotonic())) or chunk
+            except TimeoutError:
+                print(f"Translation chunk timed out after {timeout}s, keeping original text")
+            except Exception as e:
+                print(f"Translation chunk failed: {e}")
+        output.append(translated + separator)
+    return ''.join(output)
@@ -0,0 +1,163 @@
+"""Per-commodity price statistics over many markets and dates.
+
+Records are loaded once into columnar NumPy arrays and every aggregate is
+computed per group with sorts and ufunc reductions, so tens of thousands
+of records cost a few milliseconds rather than a Python loop over dicts.
+"""
+import math
+import os
+from operator import itemgetter
+
+import numpy as np
+
+from ttl_cache import TTLCache
+
+COMMODITY_ANALYTICS_TTL = int(os.environ.get('COMMODITY_ANALYTICS_TTL', 900))
+COMMODITY_ANALYTICS_CACHE_SIZE = int(os.environ.get('COMMODITY_ANALYTICS_CACHE_SIZE', 256))
+# Default window when no start date is given, counted back from the end date
+COMMODITY_ANALYTICS_DAYS = int(os.environ.get('COMMODITY_ANALYTICS_DAYS', 7))
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def _factorize(values):
+    """Return (sorted distinct values, array of each value's index into them)"""
+    labels = sorted(dict.fromkeys(values))
+    index = {label: i for i, label in enumerate(labels)}
+    return labels, np.fromiter(map(index.__getitem__, values), dtype=np.intp, count=len(values))
+
+
+class PriceColumns:
+    """CommodityStore.price_rows as arrays: string columns factorized to codes, prices as float64"""
+
+    def __init__(self, rows):
+        def column(i):
+            return list(map(itemgetter(i), rows))
+        self.districts, self.district = _factorize(column(0))
+        self.markets, self.market = _factorize(column(1))
+        self.commodities, self.commodity = _factorize(column(2))
+        # ISO dates sort chronologically, so date codes are in date order
+        self.dates, self.date = _factorize(column(3))
+        self.min_price = np.array(column(4), dtype=float)
+        self.max_price = np.array(column(5), dtype=float)
+        self.modal_price = np.array(column(6), dtype=float)
+
+    def __len__(self):
+        return len(self.modal_price)
+
+
+def _group_starts(keys):
+    """Start index of each run of equal values in sorted keys"""
+    return np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+
+
+def _sorted_percentiles(values, starts, counts, q):
+    """Linear-interpolated percentiles of each group of already sorted values; shape (groups, len(q))"""
+    position = starts[:, None] + (counts[:, None] - 1) * (np.asarray(q, dtype=float) / 100)
+    below = np.floor(position).astype(np.intp)
+    above = np.ceil(position).astype(np.intp)
+    return values[below] + (values[above] - values[below]) * (position - below)
+
+
+def _values(array):
+    """Prices as a list rounded to paise, with None for missing (NaN or infinite) values"""
+    return [value if math.isfinite(value) else None for value in np.round(array, 2).tolist()]
+
+
+def analyze(rows, percentiles=PERCENTILES):
+    """Aggregate CommodityStore.price_rows into per-commodity statistics.
+
+    For each commodity: the overall min and max price, the mean modal
+    price and mean max-min spread, percentiles of the modal price, the
+    mean modal price per date with its change from the previous date that
+    had arrivals, and the cheapest market (lowest modal price on its
+    latest date) in each district. Rows without a modal price are skipped.
+    """
+    if not rows:
+        return {'records': 0, 'dates': [], 'commodities': []}
+    cols = PriceColumns(rows)
+    valid = ~np.isnan(cols.modal_price)
+    if not valid.any():
+        return {'records': 0, 'dates': [], 'commodities': []}
+    commodity, district, market, date = cols.commodity[valid], cols.district[valid], cols.market[valid], cols.date[valid]
+    modal, low, high = cols.modal_price[valid], cols.min_price[valid], cols.max_price[valid]
+    n_commodities, n_districts, n_dates = len(cols.commodities), len(cols.districts), len(cols.dates)
+
+    # Modal price sorted within each commodity: min/max/mean/spread by reduceat, percentiles by index
+    order = np.lexsort((modal, commodity))
+    groups = commodity[order]
+    starts = _group_starts(groups)
+    counts = np.diff(np.r_[starts, len(order)])
+    present = groups[starts]
+    sorted_modal = modal[order]
+    spread = (high - low)[order]
+    has_spread = ~np.isnan(spread)
+    min_price = np.fmin.reduceat(low[order], starts)
+    max_price = np.fmax.reduceat(high[order], starts)
+    modal_mean = np.add.reduceat(sorted_modal, starts) / counts
+    with np.errstate(invalid='ignore', divide='ignore'):
+        spread_mean = (np.add.reduceat(np.where(has_spread, spread, 0), starts)
+                       / np.add.reduceat(has_spread, starts))
+    modal_percentiles = _sorted_percentiles(sorted_modal, starts, counts, percentiles)
+
+    # Distinct markets per commodity
+    pairs = np.unique(commodity * len(cols.markets) + market)
+    market_counts = np.bincount(pairs // len(cols.markets), minlength=n_commodities)
+
+    # Mean modal price per (commodity, date)
+    cell = commodity * n_dates + date
+    cell_counts = np.bincount(cell, minlength=n_commodities * n_dates).reshape(n_commodities, n_dates)
+    cell_sums = np.bincount(cell, weights=modal, minlength=n_commodities * n_dates).reshape(n_commodities, n_dates)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        daily_mean = cell_sums / cell_counts
+
+    # Cheapest market per (commodity, district): lowest modal price on the pair's latest date
+    pair = commodity * n_districts + district
+    latest = np.full(n_commodities * n_districts, -1)
+    np.maximum.at(latest, pair, date)
+    on_latest = np.flatnonzero(date == latest[pair])
+    lowest = np.full(len(latest), np.inf)
+    np.minimum.at(lowest, pair[on_latest], modal[on_latest])
+    cheapest_rows = on_latest[modal[on_latest] == lowest[pair[on_latest]]]
+    _, first = np.unique(pair[cheapest_rows], return_index=True)
+    cheapest_rows = cheapest_rows[first]
+
+    dates = cols.dates
+    cheapest = {}
+    for c, d, m, price, day in zip(commodity[cheapest_rows].tolist(), district[cheapest_rows].tolist(),
+                                   market[cheapest_rows].tolist(), _values(modal[cheapest_rows]),
+                                   date[cheapest_rows].tolist()):
+        cheapest.setdefault(c, []).append({
+            'district': cols.districts[d], 'market': cols.markets[m], 'modal_price': price, 'date': dates[day]
+        })
+
+    # Rounded to lists once; building the response is the only per-group Python loop
+    min_price, max_price, modal_mean, spread_mean = map(_values, (min_price, max_price, modal_mean, spread_mean))
+    modal_percentiles = [_values(row) for row in modal_percentiles]
+    commodities = []
+    for g, c in enumerate(present.tolist()):
+        days = np.flatnonzero(cell_counts[c])
+        means = daily_mean[c, days]
+        changes = np.r_[np.nan, np.diff(means)]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            change_pct = changes / np.r_[np.nan, means[:-1]] * 100
+        commodities.append({
+            'commodity': cols.commodities[c],
+            'records': int(counts[g]),
+            'markets': int(market_counts[c]),
+            'min_price': min_price[g],
+            'max_price': max_price[g],
+            'modal_mean': modal_mean[g],
+            'spread_mean': spread_mean[g],
+            'percentiles': {f'p{q}': v for q, v in zip(percentiles, modal_percentiles[g])},
+            'daily': [
+                {'date': dates[d], 'modal_mean': m, 'change': ch, 'change_pct': pct}
+                for d, m, ch, pct in zip(days.tolist(), _values(means), _values(changes), _values(change_pct))
+            ],
+            'cheapest_markets': cheapest.get(c, [])
+        })
+
+    return {'records': len(modal), 'dates': dates, 'commodities': commodities}
+
+
+# Keyed by (district, start, end, store version), so a new ingest is never hidden
+analytics_cache = TTLCache(COMMODITY_ANALYTICS_TTL, COMMODITY_ANALYTICS_CACHE_SIZE)
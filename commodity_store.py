@@ -0,0 +1,316 @@
+"""Local store of data.gov.in mandi prices, filled by a paged bulk ingest.
+
+Usage: python commodity_store.py [--state Gujarat] [--fixture FILE] [--page-size N] [--workers N]
+
+Run it on a schedule (the resource only carries the latest arrivals, so
+each run also extends the price history). --fixture replays a recorded
+API response instead of calling data.gov.in: either one response object
+or a list of them, whose records are paged through exactly like the
+live resource.
+"""
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import upstream
+
+COMMODITY_DB_PATH = os.environ.get('COMMODITY_DB_PATH', 'commodity_prices.sqlite3')
+COMMODITY_RESOURCE_URL = os.environ.get(
+    'COMMODITY_RESOURCE_URL', "https://api.data.gov.in/resource/35985678-0d79-46b4-9ed6-6f13308a1d24"
+)
+DATA_GOV_API_KEY = os.environ.get('DATA_GOV_API_KEY') or "579b464db66ec23bdd000001cdd3946e44ce4aad7209ff7b23ac571b"
+COMMODITY_PAGE_SIZE = int(os.environ.get('COMMODITY_PAGE_SIZE', 1000))
+# Pages fetched concurrently after the first
+COMMODITY_FETCH_WORKERS = int(os.environ.get('COMMODITY_FETCH_WORKERS', 4))
+# Seconds after its last ingest that the store still answers price lookups instead of data.gov.in
+COMMODITY_MAX_AGE = int(os.environ.get('COMMODITY_MAX_AGE', 86400))
+
+# Record fields as data.gov.in names them, in table column order
+TEXT_FIELDS = ('State', 'District', 'Market', 'Commodity', 'Variety', 'Grade')
+PRICE_FIELDS = ('Min_Price', 'Max_Price', 'Modal_Price')
+
+
+def _iso_date(value):
+    """data.gov.in dates are dd/mm/yyyy; the store keeps ISO dates so they sort and range"""
+    try:
+        return datetime.strptime(value, '%d/%m/%Y').strftime('%Y-%m-%d')
+    except (TypeError, ValueError):
+        return None
+
+
+def _price(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def to_row(record):
+    """A data.gov.in record as a prices table row, or None without a valid arrival date"""
+    arrival_date = _iso_date(record.get('Arrival_Date'))
+    if arrival_date is None:
+        return None
+    return (
+        tuple((record.get(field) or '').strip() for field in TEXT_FIELDS)
+        + (arrival_date,)
+        + tuple(_price(record.get(field)) for field in PRICE_FIELDS)
+    )
+
+
+def latest_arrivals(records):
+    """Records on their most recent arrival date, the default CommodityStore.query applies"""
+    records = list(records)
+    latest = max(filter(None, (_iso_date(record.get('Arrival_Date')) for record in records)), default=None)
+    return [record for record in records if _iso_date(record.get('Arrival_Date')) == latest]
+
+
+def _to_record(row):
+    """Inverse of to_row, in the shape data.gov.in returns"""
+    record = dict(zip(TEXT_FIELDS, row[:6]))
+    record['Arrival_Date'] = datetime.strptime(row[6], '%Y-%m-%d').strftime('%d/%m/%Y')
+    for field, value in zip(PRICE_FIELDS, row[7:]):
+        if value is None:
+            record[field] = ''
+        else:
+            record[field] = str(int(value)) if value.is_integer() else str(value)
+    return record
+
+
+class CommodityStore:
+    """SQLite table of mandi price records indexed for the app's lookups"""
+
+    def __init__(self, path=COMMODITY_DB_PATH):
+        self.path = path
+        self._db = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.executescript(
+                "CREATE TABLE IF NOT EXISTS prices ("
+                "state TEXT NOT NULL, district TEXT NOT NULL, market TEXT NOT NULL, "
+                "commodity TEXT NOT NULL, variety TEXT NOT NULL, grade TEXT NOT NULL, "
+                "arrival_date TEXT NOT NULL, min_price REAL, max_price REAL, modal_price REAL, "
+                "PRIMARY KEY (state, district, market, commodity, variety, grade, arrival_date));"
+                "CREATE INDEX IF NOT EXISTS prices_district_date ON prices (state, district, arrival_date);"
+                "CREATE INDEX IF NOT EXISTS prices_state_date ON prices (state, arrival_date);"
+                "CREATE INDEX IF NOT EXISTS prices_commodity_date ON prices (commodity, arrival_date);"
+                "CREATE INDEX IF NOT EXISTS prices_market_date ON prices (market, arrival_date);"
+                "CREATE INDEX IF NOT EXISTS prices_date ON prices (arrival_date);"
+                "CREATE TABLE IF NOT EXISTS ingest_runs ("
+                "finished_at REAL NOT NULL, source TEXT NOT NULL, state TEXT, records INTEGER NOT NULL);"
+            )
+            self._db.commit()
+        return self._db
+
+    def upsert(self, records):
+        """Insert or replace records (data.gov.in dicts); returns how many were stored"""
+        rows = [row for row in map(to_row, records) if row is not None]
+        with self._lock:
+            db = self._connection()
+            db.executemany("INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            db.commit()
+        return len(rows)
+
+    def record_run(self, source, state, records):
+        with self._lock:
+            db = self._connection()
+            db.execute("INSERT INTO ingest_runs VALUES (?, ?, ?, ?)", (time.time(), source, state, records))
+            db.commit()
+
+    def has_data(self, state):
+        with self._lock:
+            row = self._connection().execute("SELECT 1 FROM prices WHERE state = ? LIMIT 1", (state,)).fetchone()
+        return row is not None
+
+    def last_ingest(self, state):
+        """Unix time the last ingest covering state (or every state) finished, or None"""
+        with self._lock:
+            return self._connection().execute(
+                "SELECT MAX(finished_at) FROM ingest_runs WHERE state = ? OR state IS NULL", (state,)
+            ).fetchone()[0]
+
+    def is_fresh(self, state, max_age=COMMODITY_MAX_AGE):
+        """True when state has stored rows from an ingest that finished within max_age seconds"""
+        finished_at = self.last_ingest(state)
+        return finished_at is not None and time.time() - finished_at <= max_age and self.has_data(state)
+
+    def _where(self, state, district=None, market=None, commodity=None):
+        clauses, args = ["state = ?"], [state]
+        for column, value in (('district', district), ('market', market), ('commodity', commodity)):
+            if value:
+                clauses.append(f"{column} = ?")
+                args.append(value)
+        return " AND ".join(clauses), args
+
+    def version(self):
+        """Changes whenever an ingest run finishes, for keying caches of derived results"""
+        with self._lock:
+            return self._connection().execute("SELECT MAX(rowid) FROM ingest_runs").fetchone()[0]
+
+    def latest_date(self, state, district=None):
+        """Most recent ISO arrival date stored for a state or district, or None"""
+        where, args = self._where(state, district)
+        with self._lock:
+            return self._connection().execute(f"SELECT MAX(arrival_date) FROM prices WHERE {where}", args).fetchone()[0]
+
+    def rows(self, state, district=None, start=None, end=None, market=None, commodity=None):
+        """Raw rows (TEXT_FIELDS, ISO date, prices) between ISO dates start and end inclusive"""
+        where, args = self._where(state, district, market, commodity)
+        if start:
+            where += " AND arrival_date >= ?"
+            args.append(start)
+        if end:
+            where += " AND arrival_date <= ?"
+            args.append(end)
+        with self._lock:
+            return self._connection().execute(
+                f"SELECT * FROM prices WHERE {where} ORDER BY arrival_date, district, market, commodity", args
+            ).fetchall()
+
+    def price_rows(self, state, district=None, start=None, end=None):
+        """Unordered (district, market, commodity, ISO date, min, max, modal) rows for aggregation"""
+        where, args = self._where(state, district)
+        if start:
+            where += " AND arrival_date >= ?"
+            args.append(start)
+        if end:
+            where += " AND arrival_date <= ?"
+            args.append(end)
+        with self._lock:
+            return self._connection().execute(
+                "SELECT district, market, commodity, arrival_date, min_price, max_price, modal_price "
+                f"FROM prices WHERE {where}", args
+            ).fetchall()
+
+    def query(self, state, district=None, date=None, market=None, commodity=None):
+        """Records for one ISO date, defaulting to the latest date stored for the filter"""
+        date = date or self.latest_date(state, district)
+        if date is None:
+            return []
+        return [_to_record(row) for row in self.rows(state, district, date, date, market, commodity)]
+
+    def stats(self):
+        with self._lock:
+            db = self._connection()
+            count, first, last = db.execute(
+                "SELECT COUNT(*), MIN(arrival_date), MAX(arrival_date) FROM prices"
+            ).fetchone()
+            run = db.execute("SELECT finished_at, source, records FROM ingest_runs ORDER BY finished_at DESC LIMIT 1").fetchone()
+        return {
+            'records': count,
+            'first_date': first,
+            'last_date': last,
+            'last_ingest': datetime.fromtimestamp(run[0]).isoformat(timespec='seconds') if run else None,
+            'last_ingest_source': run[1] if run else None,
+            'last_ingest_records': run[2] if run else None
+        }
+
+
+def live_page(params, offset, limit):
+    """Fetch one page of the data.gov.in resource"""
+    query = dict(params, **{'api-key': DATA_GOV_API_KEY, 'format': 'json', 'offset': offset, 'limit': limit})
+    return upstream.get('data_gov', COMMODITY_RESOURCE_URL, params=query).json()
+
+
+def fixture_pages(path):
+    """Return a page fetcher that serves records from a recorded response file"""
+    with open(path, encoding='utf-8') as f:
+        payload = json.load(f)
+    records = [record for page in (payload if isinstance(payload, list) else [payload])
+               for record in page.get('records', [])]
+
+    def fetch(params, offset, limit):
+        matching = [record for record in records
+                    if all(record.get(key[len('filters['):-1]) == value
+                           for key, value in params.items() if key.startswith('filters['))]
+        return {'total': len(matching), 'count': len(matching[offset:offset + limit]),
+                'records': matching[offset:offset + limit]}
+    return fetch
+
+
+def iter_pages(fetch_page, params, page_size=COMMODITY_PAGE_SIZE, workers=COMMODITY_FETCH_WORKERS):
+    """Yield each page's records, in offset order, until the resource's total is reached.
+
+    The first page carries the total; the remaining offsets are then fetched
+    concurrently, at most workers at a time, so only that many pages are
+    held in memory however large the result set is.
+    """
+    first = fetch_page(params, 0, page_size)
+    records = first.get('records', [])
+    if not records:
+        return
+    yield records
+    total = first.get('total')
+    # The API may serve fewer records per page than asked for
+    step = len(records)
+    if total is None:
+        offset = step
+        while True:
+            records = fetch_page(params, offset, step).get('records', [])
+            if not records:
+                return
+            yield records
+            offset += len(records)
+
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='commodity-page')
+    pending = deque()
+    try:
+        for offset in range(step, int(total), step):
+            pending.append(executor.submit(fetch_page, params, offset, step))
+            if len(pending) >= workers:
+                yield pending.popleft().result().get('records', [])
+        while pending:
+            yield pending.popleft().result().get('records', [])
+    finally:
+        # Also reached when the consumer stops early, e.g. a client disconnect
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_records(fetch_page, params, page_size=COMMODITY_PAGE_SIZE, workers=COMMODITY_FETCH_WORKERS):
+    """Yield records one by one across all pages"""
+    for records in iter_pages(fetch_page, params, page_size, workers):
+        yield from records
+
+
+def ingest(store, fetch_page, state=None, page_size=COMMODITY_PAGE_SIZE, source='data.gov.in',
+           workers=COMMODITY_FETCH_WORKERS):
+    """Load every record (optionally for one state) into store; returns the count stored"""
+    params = {'filters[State]': state} if state else {}
+    stored = 0
+    for records in iter_pages(fetch_page, params, page_size, workers):
+        stored += store.upsert(records)
+    store.record_run(source, state, stored)
+    return stored
+
+
+# Shared by the app's lookups
+commodity_store = CommodityStore()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load data.gov.in mandi prices into the local store")
+    parser.add_argument('--state', default='Gujarat', help="only this state ('' for all of India)")
+    parser.add_argument('--fixture', help="recorded API response to ingest instead of calling data.gov.in")
+    parser.add_argument('--page-size', type=int, default=COMMODITY_PAGE_SIZE)
+    parser.add_argument('--workers', type=int, default=COMMODITY_FETCH_WORKERS, help="pages fetched concurrently")
+    parser.add_argument('--db', default=COMMODITY_DB_PATH)
+    args = parser.parse_args()
+
+    store = CommodityStore(args.db)
+    fetch_page = fixture_pages(args.fixture) if args.fixture else live_page
+    source = args.fixture or 'data.gov.in'
+    started = time.monotonic()
+    stored = ingest(store, fetch_page, args.state or None, args.page_size, source, args.workers)
+    print(f"Ingested {stored} records from {source} in {time.monotonic() - started:.1f}s into {args.db}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+import math
+from array import array
+from datetime import datetime, timedelta
+
+_EPOCH = datetime(1970, 1, 1)
+
+# Series holding local ISO timestamps rather than measurements
+TIME_FIELDS = ('time', 'sunrise', 'sunset')
+
+
+def to_datetime(seconds):
+    """Convert a stored time value back to the naive local datetime Open-Meteo sent"""
+    return _EPOCH + timedelta(seconds=seconds)
+
+
+def _time_column(values):
+    return array('q', ((datetime.fromisoformat(value) - _EPOCH) // timedelta(seconds=1) for value in values))
+
+
+def _value_column(values):
+    """Store integer series as 32-bit ints and everything else as doubles (None -> NaN)"""
+    if all(type(value) is int for value in values):
+        return array('i', values)
+    return array('d', (math.nan if value is None else value for value in values))
+
+
+def _merge_section(old, new):
+    """Add new's columns to old; if the time axis moved between fetches, new replaces old"""
+    if not new:
+        return old
+    if old.get('time') != new.get('time'):
+        return new
+    return {**old, **new}
+
+
+def _columns(series):
+    columns = {}
+    for name, values in series.items():
+        if not isinstance(values, list):
+            continue
+        columns[name] = _time_column(values) if name in TIME_FIELDS else _value_column(values)
+    return columns
+
+
+class Forecast:
+    """Open-Meteo forecast for one location, parsed once into typed array columns.
+
+    current is the small dict of current conditions; hourly and daily map
+    each requested series to an array, with time series stored as local
+    seconds since the epoch (see to_datetime).
+    """
+
+    __slots__ = ('latitude', 'longitude', 'current', 'hourly', 'daily')
+
+    def __init__(self, latitude, longitude, current, hourly, daily):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.current = current
+        self.hourly = hourly
+        self.daily = daily
+
+    @classmethod
+    def from_json(cls, payload):
+        return cls(
+            payload.get('latitude'),
+            payload.get('longitude'),
+            dict(payload.get('current', {})),
+            _columns(payload.get('hourly', {})),
+            _columns(payload.get('daily', {}))
+        )
+
+    def fields(self, section):
+        """Names of the series held for 'current', 'hourly' or 'daily'"""
+        return {name for name in getattr(self, section) if name not in ('time', 'interval')}
+
+    def view(self, current, hourly, hours, daily, days):
+        """Return a Forecast with only the given fields and the first hours/days rows"""
+        return Forecast(
+            self.latitude,
+            self.longitude,
+            {name: value for name, value in self.current.items() if name in current or name in ('time', 'interval')},
+            {name: column[:hours] for name, column in self.hourly.items() if name in hourly or name == 'time'},
+            {name: column[:days] for name, column in self.daily.items() if name in daily or name == 'time'}
+        )
+
+    def merge(self, other):
+        """Return a Forecast holding the columns of both, preferring other's"""
+        return Forecast(
+            self.latitude,
+            self.longitude,
+            {**self.current, **other.current},
+            _merge_section(self.hourly, other.hourly),
+            _merge_section(self.daily, other.daily)
+        )
@@ -0,0 +1,20 @@
+import os
+
+from ttl_cache import TTLCache
+
+# Open-Meteo refreshes its model output roughly hourly, so a forecast fetched
+# within the last FORECAST_CACHE_TTL seconds is as good as a fresh one.
+FORECAST_CACHE_TTL = int(os.environ.get('FORECAST_CACHE_TTL', 900))
+FORECAST_CACHE_SIZE = int(os.environ.get('FORECAST_CACHE_SIZE', 1024))
+# How long past the TTL an entry may still be served while Open-Meteo is slow or down
+FORECAST_MAX_STALE = int(os.environ.get('FORECAST_MAX_STALE', 21600))
+
+
+def make_key(lat, lon, params):
+    """Build a cache key from a location and the query fields it was fetched with"""
+    query = tuple(sorted((k, str(v)) for k, v in params.items() if k not in ('latitude', 'longitude')))
+    return (round(float(lat), 4), round(float(lon), 4), query)
+
+
+# Shared by app.py and app_voice.py so both see the same cached forecasts
+forecast_cache = TTLCache(FORECAST_CACHE_TTL, FORECAST_CACHE_SIZE, FORECAST_MAX_STALE)
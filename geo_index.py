@@ -0,0 +1,89 @@
+import math
+import os
+
+EARTH_RADIUS_KM = 6371.0
+# Coordinates further than this from every known district are not resolved
+NEAREST_MAX_KM = float(os.environ.get('NEAREST_MAX_KM', 150))
+
+
+def parse_coords(data):
+    """Return (lat, lon) floats from a request payload, or None if missing, non-finite or out of range"""
+    try:
+        lat, lon = float(data['lat']), float(data['lon'])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if not (math.isfinite(lat) and math.isfinite(lon) and -90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return lat, lon
+
+
+def _to_xyz(lat, lon):
+    """Unit-sphere point; chord distance between points orders like great-circle distance"""
+    lat, lon = math.radians(lat), math.radians(lon)
+    return (math.cos(lat) * math.cos(lon), math.cos(lat) * math.sin(lon), math.sin(lat))
+
+
+def _chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+class LocationIndex:
+    """Static 3-d KD-tree over location coordinates for nearest-neighbour lookups"""
+
+    def __init__(self, locations):
+        # locations is a list of (state, district, lat, lon)
+        self.locations = list(locations)
+        points = [(_to_xyz(lat, lon), i) for i, (_, _, lat, lon) in enumerate(self.locations)]
+        self._root = self._build(points, 0)
+
+    @classmethod
+    def from_catalog(cls, catalog):
+        """Build an index from a {state: {district: {lat, lon}}} mapping"""
+        return cls(
+            (state, district, coords['lat'], coords['lon'])
+            for state, districts in catalog.items()
+            for district, coords in districts.items()
+        )
+
+    def _build(self, points, axis):
+        # Nodes are (point, location_index, axis, left, right)
+        if not points:
+            return None
+        points.sort(key=lambda item: item[0][axis])
+        middle = len(points) // 2
+        point, index = points[middle]
+        next_axis = (axis + 1) % 3
+        return (point, index, axis,
+                self._build(points[:middle], next_axis),
+                self._build(points[middle + 1:], next_axis))
+
+    def nearest(self, lat, lon):
+        """Return (state, district, lat, lon, distance_km) of the closest location, or None if empty.
+
+        Raises ValueError for NaN or infinite coordinates.
+        """
+        if self._root is None:
+            return None
+        if not (math.isfinite(lat) and math.isfinite(lon)):
+            raise ValueError(f"Coordinates must be finite, got ({lat}, {lon})")
+
+        target = _to_xyz(lat, lon)
+        best_index, best_dist = None, math.inf
+        # Entries are (node, distance from target to the plane that led there)
+        stack = [(self._root, 0.0)]
+        while stack:
+            node, plane_dist = stack.pop()
+            # Skip subtrees whose splitting plane is further than the best match
+            if node is None or plane_dist >= best_dist:
+                continue
+            point, index, axis, left, right = node
+            dist = math.dist(point, target)
+            if dist < best_dist:
+                best_index, best_dist = index, dist
+
+            delta = target[axis] - point[axis]
+            near, far = (left, right) if delta < 0 else (right, left)
+            stack.append((far, abs(delta)))
+            stack.append((near, plane_dist))
+
+        return (*self.locations[best_index], _chord_to_km(best_dist))
@@ -0,0 +1,82 @@
+"""Response bodies built once at startup and served with strong ETags.
+
+The index page and the district lists only change when the code does, so
+app.py renders or serializes them once per process; clients revalidate
+with If-None-Match and get an empty 304 back. The whole district catalog
+can also be published as one content-versioned JSON asset that browsers
+and CDNs keep for a year:
+
+Usage: python http_cache.py --out DIR    (writes DIR/catalog.<version>.json)
+"""
+import argparse
+import hashlib
+import json
+import os
+
+from flask import current_app, request
+
+# How long browsers may reuse the index page and district lists before revalidating
+CATALOG_MAX_AGE = int(os.environ.get('CATALOG_MAX_AGE', 3600))
+# Have the index page load every district from one versioned catalog asset instead of /get_districts
+CATALOG_ASSET_ENABLED = os.environ.get('CATALOG_ASSET_ENABLED', '').lower() in ('1', 'true', 'yes')
+# Where catalog.<version>.json is published (e.g. a CDN); by default app.py serves it itself
+CATALOG_ASSET_BASE_URL = os.environ.get('CATALOG_ASSET_BASE_URL', '').rstrip('/')
+# Versioned URLs never change content, so they may be cached for a year
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+class CachedBody:
+    """An unchanging response body with its strong ETag and caching policy"""
+
+    def __init__(self, body, mimetype, max_age=CATALOG_MAX_AGE, immutable=False):
+        self.body = body.encode('utf-8') if isinstance(body, str) else body
+        self.mimetype = mimetype
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+        self.max_age = max_age
+        self.immutable = immutable
+
+    def response(self):
+        """Response for the current request: the body, or 304 if If-None-Match has our ETag"""
+        response = current_app.response_class(self.body, mimetype=self.mimetype)
+        response.set_etag(self.etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = self.max_age
+        if self.immutable:
+            response.cache_control.immutable = True
+        return response.make_conditional(request)
+
+
+def catalog_json(locations):
+    """The state -> [districts] catalog as compact JSON, stable across runs"""
+    catalog = {state: list(districts) for state, districts in sorted(locations.items())}
+    return json.dumps(catalog, ensure_ascii=False, separators=(',', ':'))
+
+
+class CatalogAsset(CachedBody):
+    """The district catalog as an immutable asset whose file name carries a content hash"""
+
+    def __init__(self, locations):
+        super().__init__(catalog_json(locations), 'application/json', max_age=IMMUTABLE_MAX_AGE, immutable=True)
+        self.version = self.etag[:12]
+        self.filename = f"catalog.{self.version}.json"
+        self.url = f"{CATALOG_ASSET_BASE_URL}/{self.filename}"
+
+
+def main():
+    from locations import INDIAN_LOCATIONS
+
+    parser = argparse.ArgumentParser(description="Write the versioned district catalog asset for a CDN or static host")
+    parser.add_argument('--out', default='.', help="directory to write catalog.<version>.json into")
+    args = parser.parse_args()
+
+    asset = CatalogAsset(INDIAN_LOCATIONS)
+    os.makedirs(args.out, exist_ok=True)
+    path = os.path.join(args.out, asset.filename)
+    with open(path, 'wb') as f:
+        f.write(asset.body)
+    print(f"Wrote {path} ({len(asset.body)} bytes); serve it with "
+          f"Cache-Control: public, max-age={IMMUTABLE_MAX_AGE}, immutable and set CATALOG_ASSET_BASE_URL")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""Faster JSON and compressed responses for app.py and app_voice.py.
+
+When orjson is installed it replaces the stdlib encoder behind jsonify:
+it is several times faster and writes Hindi and Gujarati as UTF-8 rather
+than \\u escapes, which alone shrinks those replies by half. Bodies of at
+least COMPRESS_MIN_BYTES are compressed with brotli (when installed) or
+gzip, whichever the client's Accept-Encoding prefers. Cacheable responses
+are compressed once at the highest level and the result reused.
+"""
+import gzip
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Below this, compression saves less than the headers and CPU it costs
+COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', 1024))
+# Compressed bodies of cacheable responses kept for reuse
+PRECOMPRESSED_CACHE_BYTES = int(os.environ.get('PRECOMPRESSED_CACHE_BYTES', 8 * 1024 * 1024))
+
+COMPRESSIBLE_MIMETYPES = frozenset({
+    'application/json', 'application/javascript', 'text/html', 'text/plain', 'text/css', 'text/javascript',
+    'image/svg+xml'
+})
+
+# encoding -> (compress(body, level), level per request, level for cacheable bodies)
+ENCODERS = {'gzip': (lambda body, level: gzip.compress(body, compresslevel=level, mtime=0), 6, 9)}
+if brotli is not None:
+    ENCODERS['br'] = (lambda body, level: brotli.compress(body, quality=level), 4, 11)
+# Server preference when the client rates several encodings equally
+ENCODING_PREFERENCE = [encoding for encoding in ('br', 'gzip') if encoding in ENCODERS]
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, same output types as the default one"""
+
+    def _encode(self, obj):
+        # Dates and dataclasses go through Flask's default hook, as with the stdlib encoder
+        options = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+                   | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS)
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=options)
+
+    def dumps(self, obj, **kwargs):
+        # Formatting options (indent etc.) are the stdlib encoder's job
+        if set(kwargs) - {'separators'}:
+            return super().dumps(obj, **kwargs)
+        try:
+            return self._encode(obj).decode('utf-8')
+        except TypeError:
+            # e.g. integers beyond 64 bits
+            return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        try:
+            body = self._encode(obj)
+        except TypeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+class PrecompressedCache:
+    """Compressed bodies keyed by content hash and encoding, bounded by total size"""
+
+    def __init__(self, max_bytes=PRECOMPRESSED_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, body, encoding):
+        key = (hashlib.sha1(body).digest(), encoding)
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return compressed
+            self.misses += 1
+
+        compress, _, level = ENCODERS[encoding]
+        compressed = compress(body, level)
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = compressed
+                self._total += len(compressed)
+            while self._total > self.max_bytes and len(self._entries) > 1:
+                _, old = self._entries.popitem(last=False)
+                self._total -= len(old)
+        return compressed
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._total, 'hits': self.hits, 'misses': self.misses}
+
+
+precompressed = PrecompressedCache()
+
+
+def _cacheable(response):
+    cache_control = response.cache_control
+    return bool((cache_control.public or cache_control.max_age)
+                and not (cache_control.private or cache_control.no_store))
+
+
+def compress_response(response):
+    """after_request hook: compress the body in the best encoding the client accepts"""
+    if (response.direct_passthrough or response.is_streamed or 'Content-Encoding' in response.headers
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+    encoding = request.accept_encodings.best_match(ENCODING_PREFERENCE)
+    if encoding is None:
+        return response
+
+    if _cacheable(response):
+        compressed = precompressed.get(body, encoding)
+    else:
+        compress, level, _ = ENCODERS[encoding]
+        compressed = compress(body, level)
+    if len(compressed) >= len(body):
+        return response
+
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        # The bytes differ per encoding; a weak tag still matches If-None-Match for every variant
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_app(app):
+    """Use orjson for jsonify when available and compress eligible responses"""
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
+    app.after_request(compress_response)
+
+
+def stats():
+    return {
+        'json_encoder': 'orjson' if orjson is not None else 'json',
+        'encodings': ENCODING_PREFERENCE,
+        'min_bytes': COMPRESS_MIN_BYTES,
+        'precompressed': precompressed.stats()
+    }
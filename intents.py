@@ -0,0 +1,80 @@
+"""Rule-based intent routing for voice and text commands.
+
+Weather and commodity questions are answered from our own data, so they
+are recognised locally in English, Hindi and Gujarati; only what matches
+neither with enough confidence goes to the chat model.
+"""
+import os
+from collections import namedtuple
+
+from keyword_matcher import KeywordMatcher
+from locations import NATIVE_SUFFIXES, find_locations
+
+WEATHER = 'weather'
+COMMODITY = 'commodity'
+CHAT = 'chat'
+
+# Scores below this fall through to the chat model
+INTENT_MIN_CONFIDENCE = float(os.environ.get('INTENT_MIN_CONFIDENCE', 0.6))
+# Added to weather and commodity scores when the text names a place
+LOCATION_BONUS = 0.25
+
+# Keyword -> weight; 1.0 decides the intent on its own, smaller weights need support
+INTENT_KEYWORDS = {
+    WEATHER: {
+        'weather': 1.0, 'forecast': 1.0, 'forecasts': 1.0, 'temperature': 1.0, 'climate': 1.0,
+        'humidity': 1.0, 'rain': 0.75, 'raining': 0.75, 'rainfall': 0.75, 'rainy': 0.75,
+        'monsoon': 0.75, 'storm': 0.5, 'wind': 0.5, 'sunny': 0.5, 'cloudy': 0.5, 'hot': 0.25, 'cold': 0.25,
+        'मौसम': 1.0, 'तापमान': 1.0, 'पूर्वानुमान': 1.0, 'बारिश': 0.75, 'वर्षा': 0.75, 'गर्मी': 0.5, 'ठंड': 0.5,
+        'હવામાન': 1.0, 'મોસમ': 1.0, 'મૌસમ': 1.0, 'તાપમાન': 1.0, 'આગાહી': 1.0, 'વરસાદ': 0.75,
+        'ગરમી': 0.5, 'ઠંડી': 0.5,
+    },
+    COMMODITY: {
+        'price': 1.0, 'prices': 1.0, 'commodity': 1.0, 'commodities': 1.0, 'mandi': 1.0, 'apmc': 1.0,
+        'market price': 1.0, 'market rate': 1.0, 'market': 0.5, 'rate': 0.5, 'rates': 0.5, 'cost': 0.5,
+        'भाव': 1.0, 'कीमत': 1.0, 'दाम': 1.0, 'मंडी': 1.0, 'बाजार': 0.5,
+        'ભાવ': 1.0, 'કિંમત': 1.0, 'બજાર': 0.5, 'માર્કેટ': 0.5, 'યાર્ડ': 0.5,
+        # Crops people ask prices for
+        'wheat': 0.5, 'cotton': 0.5, 'onion': 0.5, 'potato': 0.5, 'tomato': 0.5, 'groundnut': 0.5,
+        'गेहूं': 0.5, 'कपास': 0.5, 'प्याज': 0.5, 'आलू': 0.5, 'टमाटर': 0.5, 'मूंगफली': 0.5,
+        'ઘઉં': 0.5, 'કપાસ': 0.5, 'ડુંગળી': 0.5, 'બટાટા': 0.5, 'ટામેટા': 0.5, 'મગફળી': 0.5,
+    },
+}
+
+Intent = namedtuple('Intent', ['name', 'confidence', 'locations'])
+
+_keyword_matcher = KeywordMatcher(
+    ((keyword, (intent, keyword, weight)) for intent, keywords in INTENT_KEYWORDS.items()
+     for keyword, weight in keywords.items()),
+    suffixes=NATIVE_SUFFIXES
+)
+
+
+def classify_intent(text):
+    """Return the Intent for text, with a confidence in [0, 1] and the (state, district) pairs it names.
+
+    Each intent scores the weights of its distinct keywords found, plus
+    LOCATION_BONUS if a place is named. Confidence is the best score,
+    capped at 1 and discounted by half of any competing intent's score,
+    so mixed questions still route; ties go to weather as they always did.
+    """
+    scores = dict.fromkeys(INTENT_KEYWORDS, 0.0)
+    seen = set()
+    for _, _, values in _keyword_matcher.find_all(text):
+        for intent, keyword, weight in values:
+            if keyword not in seen:
+                seen.add(keyword)
+                scores[intent] += weight
+
+    locations = find_locations(text)
+    if locations:
+        for intent in scores:
+            if scores[intent]:
+                scores[intent] += LOCATION_BONUS
+
+    ranked = sorted(scores.items(), key=lambda item: -item[1])
+    (best, score), (_, runner_up) = ranked[0], ranked[1]
+    confidence = round(min(1.0, score) * score / (score + runner_up / 2), 2) if score else 0.0
+    if confidence < INTENT_MIN_CONFIDENCE:
+        return Intent(CHAT, round(1.0 - confidence, 2), locations)
+    return Intent(best, confidence, locations)
@@ -0,0 +1,112 @@
+import unicodedata
+from collections import deque
+
+
+def normalize(text):
+    """NFC, case-folded, whitespace-collapsed form that matching runs on"""
+    return ' '.join(unicodedata.normalize('NFC', text).casefold().split())
+
+
+def _is_word_char(ch):
+    # Indic vowel signs and viramas are combining marks, not letters
+    return ch.isalnum() or unicodedata.category(ch)[0] == 'M'
+
+
+class KeywordMatcher:
+    """Aho-Corasick automaton that finds whole-word phrases in one pass over a text.
+
+    suffixes lists endings that may be glued to a phrase without breaking
+    the word boundary, such as Gujarati postpositions ("અમદાવાદમાં").
+    """
+
+    def __init__(self, phrases, suffixes=()):
+        # phrases is an iterable of (phrase, value); a phrase may carry several values
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+        self._patterns = []
+        self.suffixes = tuple(normalize(suffix) for suffix in suffixes)
+
+        index = {}
+        for phrase, value in phrases:
+            phrase = normalize(phrase)
+            if not phrase:
+                continue
+            if phrase in index:
+                values = self._patterns[index[phrase]][1]
+                if value not in values:
+                    values.append(value)
+                continue
+
+            node = 0
+            for ch in phrase:
+                child = self._goto[node].get(ch)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto[node][ch] = child
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                node = child
+            index[phrase] = len(self._patterns)
+            self._out[node].append(index[phrase])
+            self._patterns.append((len(phrase), [value]))
+
+        self._link()
+
+    def __len__(self):
+        return len(self._patterns)
+
+    def _link(self):
+        """Compute failure links breadth-first and merge outputs along them"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def _ends_word(self, text, end):
+        if end == len(text) or not _is_word_char(text[end]):
+            return True
+        for suffix in self.suffixes:
+            if text.startswith(suffix, end):
+                after = end + len(suffix)
+                if after == len(text) or not _is_word_char(text[after]):
+                    return True
+        return False
+
+    def find_all(self, text):
+        """Return non-overlapping (start, end, values) matches, leftmost-longest first.
+
+        Offsets refer to normalize(text).
+        """
+        text = normalize(text)
+        found = []
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for pattern in self._out[node]:
+                length, values = self._patterns[pattern]
+                start = i + 1 - length
+                if (start == 0 or not _is_word_char(text[start - 1])) and self._ends_word(text, i + 1):
+                    found.append((start, i + 1, values))
+
+        found.sort(key=lambda match: (match[0], match[0] - match[1]))
+        matches = []
+        end = 0
+        for match in found:
+            if match[0] >= end:
+                matches.append(match)
+                end = match[1]
+        return matches
+
+    def values(self, text):
+        """Values of every match in text order"""
+        return [value for _, _, values in self.find_all(text) for value in values]
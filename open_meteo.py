@@ -0,0 +1,254 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from forecast import Forecast
+from forecast_cache import forecast_cache, make_key
+from singleflight import weather_flights
+import upstream
+
+OPEN_METEO_URL = "https://api.open-meteo.com/v1/forecast"
+# Locations per multi-coordinate request, kept small enough for a sane URL length
+OPEN_METEO_BATCH_SIZE = int(os.environ.get('OPEN_METEO_BATCH_SIZE', 50))
+
+SECTIONS = ('current', 'hourly', 'daily')
+
+# Stale-while-revalidate refreshes run here so requests never wait on them
+_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='weather-refresh')
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def _split(fields):
+    return frozenset(field for field in fields.split(',') if field) if isinstance(fields, str) else frozenset(fields)
+
+
+class ForecastSpec:
+    """The fields and horizon a caller needs from Open-Meteo.
+
+    days and hours are the daily and hourly horizons; each is 0 when the
+    spec asks for no series in that section.
+    """
+
+    __slots__ = ('current', 'hourly', 'daily', 'days', 'hours', 'timezone')
+
+    def __init__(self, current=(), hourly=(), daily=(), days=0, hours=0, timezone='GMT'):
+        self.current = _split(current)
+        self.hourly = _split(hourly)
+        self.daily = _split(daily)
+        self.days = days if self.daily else 0
+        self.hours = hours if self.hourly else 0
+        self.timezone = timezone
+
+    @classmethod
+    def from_params(cls, params):
+        """Build a spec from an Open-Meteo style query dict"""
+        days = int(params.get('forecast_days', 7))
+        hours = int(params.get('forecast_hours', days * 24))
+        return cls(params.get('current', ''), params.get('hourly', ''), params.get('daily', ''),
+                   days, hours, params.get('timezone', 'GMT'))
+
+    @classmethod
+    def of(cls, forecast, days, hours, timezone):
+        """Describe the fields a Forecast actually holds"""
+        return cls(forecast.fields('current'), forecast.fields('hourly'), forecast.fields('daily'),
+                   days, hours, timezone)
+
+    def _key(self):
+        return (self.current, self.hourly, self.daily, self.days, self.hours, self.timezone)
+
+    def __eq__(self, other):
+        return isinstance(other, ForecastSpec) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __bool__(self):
+        return bool(self.current or self.hourly or self.daily)
+
+    def reaches(self, other):
+        """True if this spec's horizon is at least as long as other's"""
+        return self.days >= other.days and self.hours >= other.hours
+
+    def covers(self, other):
+        """True if data fetched for this spec can serve other"""
+        return (other.current <= self.current and other.hourly <= self.hourly
+                and other.daily <= self.daily and self.reaches(other))
+
+    def union(self, other):
+        return ForecastSpec(self.current | other.current, self.hourly | other.hourly, self.daily | other.daily,
+                            max(self.days, other.days), max(self.hours, other.hours), self.timezone)
+
+    def missing(self, other):
+        """Fields other needs that this spec lacks, at this spec's horizon where it has one"""
+        return ForecastSpec(other.current - self.current, other.hourly - self.hourly, other.daily - self.daily,
+                            self.days or other.days, self.hours or other.hours, self.timezone)
+
+    def to_params(self):
+        """Open-Meteo query asking for exactly this spec"""
+        params = {'timezone': self.timezone}
+        for section in SECTIONS:
+            fields = getattr(self, section)
+            if fields:
+                params[section] = ','.join(sorted(fields))
+        params['forecast_days'] = max(self.days, -(-self.hours // 24), 1)
+        if self.hourly:
+            # Hourly rows then start at the current hour rather than midnight
+            params['forecast_hours'] = self.hours
+        return params
+
+    def cut(self, forecast):
+        """Return the view of a cached superset forecast that this spec asked for"""
+        return forecast.view(self.current, self.hourly, self.hours, self.daily, self.days)
+
+
+def _cache_key(lat, lon, spec):
+    # One entry per location; fields and horizon vary inside the entry
+    return make_key(lat, lon, {'timezone': spec.timezone})
+
+
+def _request_forecasts(coords, spec):
+    """Fetch Forecasts for a list of (lat, lon) pairs in a single upstream request"""
+    query = spec.to_params()
+    query['latitude'] = ','.join(str(lat) for lat, _ in coords)
+    query['longitude'] = ','.join(str(lon) for _, lon in coords)
+
+    response = upstream.get('open_meteo', OPEN_METEO_URL, params=query)
+    payload = response.json()
+    # Open-Meteo only returns a list when more than one location is requested
+    if not isinstance(payload, list):
+        payload = [payload]
+    return [Forecast.from_json(item) for item in payload]
+
+
+def _plan(entry, spec, refresh=False):
+    """Decide what to ask Open-Meteo for given the cached (value, age) entry.
+
+    Returns (fetch_spec, base). A fresh entry whose horizon is long enough
+    is extended with only the fields it lacks (base is that entry);
+    otherwise everything cached plus everything asked for is fetched again.
+    """
+    if entry is None:
+        return spec, None
+    (cached_spec, forecast), age = entry
+    if not refresh and age <= forecast_cache.ttl and cached_spec.reaches(spec):
+        return cached_spec.missing(spec), entry
+    return cached_spec.union(spec), None
+
+
+def _store(cache_key, fetch_spec, forecast, base):
+    """Cache a fetched forecast, merging it into base; returns the stored (spec, forecast)"""
+    age = 0
+    if base is not None:
+        (cached_spec, cached), age = base
+        forecast = cached.merge(forecast)
+        fetch_spec = cached_spec.union(fetch_spec)
+    value = (ForecastSpec.of(forecast, fetch_spec.days, fetch_spec.hours, fetch_spec.timezone), forecast)
+    forecast_cache.set(cache_key, value, age)
+    return value
+
+
+def fetch_forecast(lat, lon, params):
+    """Fetch the fields and horizon params asks for through the shared cache.
+
+    Returns (forecast, stale_age) where stale_age is None for fresh data, or
+    the age in seconds of a cached copy served past its TTL. Expired entries
+    are returned immediately while a single background refresh runs, and
+    are also the fallback when Open-Meteo fails. Raises only if nothing
+    usable is cached.
+    """
+    spec = ForecastSpec.from_params(params)
+    cache_key = _cache_key(lat, lon, spec)
+    entry = forecast_cache.get_entry(cache_key)
+    if entry is not None:
+        (cached_spec, forecast), age = entry
+        if cached_spec.covers(spec):
+            if age <= forecast_cache.ttl:
+                return spec.cut(forecast), None
+            _refresh_in_background(cache_key, lat, lon, cached_spec)
+            return spec.cut(forecast), age
+
+    # Concurrent fetches for a location wait on a single upstream request. A
+    # follower needing fields the leader did not ask for goes once more.
+    for _ in range(2):
+        cached_spec, forecast = weather_flights.do(cache_key, _fetch_and_store, cache_key, lat, lon, spec)
+        if cached_spec.covers(spec):
+            break
+    return spec.cut(forecast), None
+
+
+def _fetch_and_store(cache_key, lat, lon, spec, refresh=False):
+    fetch_spec, base = _plan(forecast_cache.peek(cache_key), spec, refresh)
+    if not fetch_spec:
+        return base[0]
+    forecast = _request_forecasts([(lat, lon)], fetch_spec)[0]
+    return _store(cache_key, fetch_spec, forecast, base)
+
+
+def _refresh_in_background(cache_key, lat, lon, spec):
+    """Schedule one refresh of an expired entry, ignoring duplicates already queued"""
+    with _refreshing_lock:
+        if cache_key in _refreshing:
+            return
+        _refreshing.add(cache_key)
+    _refresh_executor.submit(_refresh, cache_key, lat, lon, spec)
+
+
+def _refresh(cache_key, lat, lon, spec):
+    try:
+        weather_flights.do(cache_key, _fetch_and_store, cache_key, lat, lon, spec, refresh=True)
+    except Exception as e:
+        print(f"Background weather refresh failed: {e}")
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(cache_key)
+
+
+def fetch_forecasts(coords, params, refresh=False):
+    """Fetch forecasts for many (lat, lon) pairs, batching cache misses.
+
+    Locations needing the same upstream query share multi-coordinate
+    requests. Expired entries are fetched again with the misses and served
+    stale if their batch fails. With refresh=True every location is
+    fetched again, keeping any fields other callers added to its entry.
+    Returns a list of (forecast, stale_age) aligned with coords, as in
+    fetch_forecast; forecast is None where nothing usable could be fetched.
+    """
+    spec = ForecastSpec.from_params(params)
+    results = [(None, None)] * len(coords)
+    plans = {}
+
+    for i, (lat, lon) in enumerate(coords):
+        cache_key = _cache_key(lat, lon, spec)
+        if cache_key in plans:
+            plans[cache_key][2].append(i)
+            continue
+
+        entry = forecast_cache.peek(cache_key) if refresh else forecast_cache.get_entry(cache_key)
+        if entry is not None and not refresh and entry[0][0].covers(spec):
+            if entry[1] <= forecast_cache.ttl:
+                results[i] = (spec.cut(entry[0][1]), None)
+                continue
+            results[i] = (spec.cut(entry[0][1]), entry[1])
+        fetch_spec, base = _plan(entry, spec, refresh)
+        plans[cache_key] = (fetch_spec, base, [i])
+
+    groups = {}
+    for cache_key, (fetch_spec, _, _) in plans.items():
+        groups.setdefault(fetch_spec, []).append(cache_key)
+
+    for fetch_spec, keys in groups.items():
+        for start in range(0, len(keys), OPEN_METEO_BATCH_SIZE):
+            batch = keys[start:start + OPEN_METEO_BATCH_SIZE]
+            try:
+                forecasts = _request_forecasts([coords[plans[key][2][0]] for key in batch], fetch_spec)
+            except Exception as e:
+                print(f"Error fetching batched weather data: {e}")
+                continue
+
+            for cache_key, forecast in zip(batch, forecasts):
+                _, stored = _store(cache_key, fetch_spec, forecast, plans[cache_key][1])
+                for i in plans[cache_key][2]:
+                    results[i] = (spec.cut(stored), None)
+
+    return results
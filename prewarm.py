@@ -0,0 +1,115 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import open_meteo
+
+PREWARM_ENABLED = os.environ.get('PREWARM_ENABLED', '').lower() in ('1', 'true', 'yes')
+# Keep the cadence below FORECAST_CACHE_TTL so entries are refreshed before they expire
+PREWARM_INTERVAL = int(os.environ.get('PREWARM_INTERVAL', 600))
+PREWARM_BATCH_SIZE = int(os.environ.get('PREWARM_BATCH_SIZE', 25))
+PREWARM_WORKERS = int(os.environ.get('PREWARM_WORKERS', 2))
+# Upstream batch requests started per second
+PREWARM_RATE = float(os.environ.get('PREWARM_RATE', 1))
+
+
+class ForecastPrewarmer:
+    """Background scheduler that keeps a location catalog warm in the forecast cache"""
+
+    def __init__(self, locations, params, interval=PREWARM_INTERVAL, batch_size=PREWARM_BATCH_SIZE,
+                 max_workers=PREWARM_WORKERS, rate=PREWARM_RATE):
+        # locations is a list of (state, district, lat, lon)
+        self.locations = list(locations)
+        self.params = params
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.rate = rate
+        self.last_refresh = {}
+        self.last_cycle_started = None
+        self.last_cycle_seconds = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_catalog(cls, catalog, params, **kwargs):
+        """Build a prewarmer from a {state: {district: {lat, lon}}} mapping"""
+        locations = [
+            (state, district, coords['lat'], coords['lon'])
+            for state, districts in catalog.items()
+            for district, coords in districts.items()
+        ]
+        return cls(locations, params, **kwargs)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the background refresh loop if it is not already running"""
+        with self._lock:
+            if self.running:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='forecast-prewarmer', daemon=True)
+            self._thread.start()
+        print(f"Forecast prewarmer started for {len(self.locations)} locations")
+
+    def stop(self, timeout=None):
+        """Signal the refresh loop to stop and wait for the current batch to finish"""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def _run(self):
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='prewarm') as executor:
+            while not self._stop.is_set():
+                started = time.monotonic()
+                self.run_cycle(executor)
+                self.last_cycle_seconds = round(time.monotonic() - started, 2)
+                self._stop.wait(max(0, self.interval - self.last_cycle_seconds))
+
+    def run_cycle(self, executor):
+        """Refresh every location once, spacing batch requests by the configured rate"""
+        self.last_cycle_started = datetime.now().isoformat(timespec='seconds')
+        futures = []
+        for start in range(0, len(self.locations), self.batch_size):
+            if self._stop.is_set():
+                break
+            futures.append(executor.submit(self._refresh_batch, self.locations[start:start + self.batch_size]))
+            if self.rate > 0:
+                self._stop.wait(1 / self.rate)
+
+        for future in futures:
+            future.result()
+
+    def _refresh_batch(self, batch):
+        try:
+            results = open_meteo.fetch_forecasts(
+                [(lat, lon) for _, _, lat, lon in batch], self.params, refresh=True
+            )
+        except Exception as e:
+            print(f"Prewarm batch failed: {e}")
+            return
+
+        refreshed_at = datetime.now().isoformat(timespec='seconds')
+        for (state, district, _, _), (data, _) in zip(batch, results):
+            if data is not None:
+                self.last_refresh[(state, district)] = refreshed_at
+
+    def status(self):
+        """Return scheduler state and the last refresh time of every location"""
+        return {
+            'running': self.running,
+            'interval': self.interval,
+            'last_cycle_started': self.last_cycle_started,
+            'last_cycle_seconds': self.last_cycle_seconds,
+            'locations': [
+                {'state': state, 'district': district, 'last_refresh': self.last_refresh.get((state, district))}
+                for state, district, _, _ in self.locations
+            ]
+        }
@@ -0,0 +1,50 @@
+"""Serve app.py or app_voice.py on a cooperative event loop.
+
+Every upstream client these apps use (requests, deep-translator, gTTS,
+speech_recognition, anthropic) does blocking socket I/O. Patching the
+standard library with gevent turns those calls into cooperative yields,
+so a single process keeps hundreds of upstream calls in flight while
+the Flask routes and response formats stay exactly the same.
+
+Usage: python serve_async.py [app|app_voice] [--host 0.0.0.0] [--port 5000]
+"""
+# Must run before anything imports socket, ssl or threading
+from gevent import monkey
+monkey.patch_all()
+
+# Before the local modules below read their settings from the environment
+from dotenv import load_dotenv
+load_dotenv()
+
+import argparse
+import importlib
+import os
+
+from gevent.pool import Pool
+from gevent.pywsgi import WSGIServer
+
+from prewarm import PREWARM_ENABLED
+
+# Concurrent requests handled by one process
+ASYNC_MAX_CONNECTIONS = int(os.environ.get('ASYNC_MAX_CONNECTIONS', 1000))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a chatbot app on a gevent event loop")
+    parser.add_argument('app', nargs='?', default='app', choices=['app', 'app_voice'])
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    args = parser.parse_args()
+
+    module = importlib.import_module(args.app)
+    if PREWARM_ENABLED:
+        module.prewarmer.start()
+
+    server = WSGIServer((args.host, args.port), module.app, spawn=Pool(ASYNC_MAX_CONNECTIONS))
+    print(f"🚀 Serving {args.app} on http://{args.host}:{args.port} "
+          f"(async mode, up to {ASYNC_MAX_CONNECTIONS} concurrent requests)")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+import threading
+from concurrent.futures import Future
+
+_groups = []
+
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one in-flight call"""
+
+    def __init__(self, name):
+        self.name = name
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.collapsed = 0
+        _groups.append(self)
+
+    def do(self, key, fn, *args, **kwargs):
+        """Run fn for key, or wait for the identical call already in flight.
+
+        Every caller gets the leader's result, or its exception re-raised.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.collapsed += 1
+                leader = False
+            else:
+                future = Future()
+                self._in_flight[key] = future
+                self.calls += 1
+                leader = True
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'collapsed': self.collapsed,
+                'in_flight': len(self._in_flight)
+            }
+
+
+def stats():
+    """Return counters for every single-flight group"""
+    return {group.name: group.stats() for group in _groups}
+
+
+weather_flights = SingleFlight('weather')
+translation_flights = SingleFlight('translation')
+commodity_flights = SingleFlight('commodity')
+tts_flights = SingleFlight('tts')
@@ -0,0 +1,23 @@
+import pytest
+
+import app
+
+
+@pytest.fixture
+def client():
+    return app.app.test_client()
+
+
+@pytest.mark.parametrize('locations', [
+    [[["a"], "b"]],
+    [["Gujarat"]],
+    [["Gujarat", "Rajkot", "extra"]],
+    [{"state": ["Gujarat"], "district": "Rajkot"}],
+    [{"state": "Gujarat"}],
+    [7],
+    "Gujarat",
+])
+def test_weather_batch_rejects_malformed_locations(client, locations):
+    response = client.post('/get_weather_batch', json={'locations': locations})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Locations must be state/district pairs'}
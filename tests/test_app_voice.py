@@ -0,0 +1,15 @@
+import pytest
+
+import app_voice
+
+
+@pytest.fixture
+def client():
+    return app_voice.app.test_client()
+
+
+@pytest.mark.parametrize('body', [{'start': 20261001}, {'end': ['2026-10-18']}, {'start': '18/10/2026'}])
+def test_commodity_analytics_rejects_bad_dates(client, body):
+    response = client.post('/commodity_analytics', json=body)
+    assert response.status_code == 400
+    assert response.get_json()['data'] == {'error': "Dates must be YYYY-MM-DD"}
@@ -0,0 +1,29 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from audio_pool import AudioPool
+
+
+def test_pool_recovers_after_a_worker_dies():
+    pool = AudioPool(workers=1, max_pending=2, timeout=30)
+    try:
+        assert pool.run(pow, 3, 2) == 9
+        with pytest.raises(BrokenProcessPool):
+            pool.run(os._exit, 1)
+        assert pool.run(pow, 2, 5) == 32
+        assert pool.stats()['pending'] == 0
+    finally:
+        pool.shutdown()
+
+
+def test_submit_to_a_broken_pool_retries_on_a_new_one():
+    pool = AudioPool(workers=1, max_pending=2, timeout=30)
+    try:
+        broken = pool._pool()
+        broken._broken = "worker died"
+        assert pool.run(pow, 2, 3) == 8
+        assert pool._executor is not broken
+    finally:
+        pool.shutdown()
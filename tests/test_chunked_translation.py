@@ -0,0 +1,39 @@
+import threading
+import time
+
+from chunked_translation import _split_long, translate_chunked
+
+
+def test_hard_split_word_keeps_order():
+    text = "Sentence one. " + "w" * 30
+    parts = _split_long(text, 20)
+    assert parts == ["Sentence one.", "w" * 20, "w" * 10]
+    assert " ".join(parts) == "Sentence one. " + "w" * 20 + " " + "w" * 10
+
+
+def test_word_order_preserved_around_long_words():
+    words = ["alpha", "b" * 45, "gamma", "delta", "e" * 21, "zeta"]
+    parts = _split_long(" ".join(words), 20)
+    assert all(len(part) <= 20 for part in parts)
+    assert " ".join(parts).replace(" ", "") == "".join(words)
+
+
+def test_single_chunk_times_out_to_source_text():
+    release = threading.Event()
+
+    def translate(text):
+        release.wait(5)
+        return text.upper()
+
+    started = time.monotonic()
+    assert translate_chunked("short text", translate, timeout=0.1) == "short text"
+    assert time.monotonic() - started < 1
+    release.set()
+
+
+def test_single_chunk_failure_returns_source_text():
+    def translate(text):
+        raise RuntimeError("translator down")
+
+    assert translate_chunked("short text", translate) == "short text"
+    assert translate_chunked("short text", str.upper) == "SHORT TEXT"
@@ -0,0 +1,41 @@
+from commodity_analytics import analyze
+from commodity_store import to_row
+
+EMPTY = {'records': 0, 'dates': [], 'commodities': []}
+
+
+def price_row(record):
+    """A data.gov.in record in CommodityStore.price_rows shape"""
+    row = to_row(record)
+    return row[1:4] + row[6:]
+
+
+def record(market, modal, date='18/10/2026'):
+    return {'State': 'Gujarat', 'District': 'Rajkot', 'Market': market, 'Commodity': 'Cotton',
+            'Variety': 'Other', 'Grade': 'FAQ', 'Arrival_Date': date,
+            'Min_Price': '6800', 'Max_Price': '7600', 'Modal_Price': modal}
+
+
+def test_no_rows():
+    assert analyze([]) == EMPTY
+
+
+def test_rows_without_any_modal_price():
+    rows = [price_row(record('Rajkot', '')), price_row(record('Gondal', 'NR')), price_row(record('Jetpur', None))]
+    assert all(row[6] is None for row in rows)
+    assert analyze(rows) == EMPTY
+
+
+def test_rows_without_modal_price_are_skipped():
+    rows = [price_row(record('Rajkot', '')), price_row(record('Gondal', '7100')),
+            price_row(record('Jetpur', '7300', date='17/10/2026'))]
+    result = analyze(rows)
+    assert result['records'] == 2
+    [cotton] = result['commodities']
+    assert cotton['records'] == 2
+    assert cotton['modal_mean'] == 7200.0
+    assert [day['modal_mean'] for day in cotton['daily']] == [7300.0, 7100.0]
+    assert cotton['daily'][1]['change'] == -200.0
+    assert cotton['cheapest_markets'] == [
+        {'district': 'Rajkot', 'market': 'Gondal', 'modal_price': 7100.0, 'date': '2026-10-18'}
+    ]
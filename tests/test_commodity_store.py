@@ -0,0 +1,68 @@
+import json
+import os
+
+from commodity_store import CommodityStore, fixture_pages, ingest, latest_arrivals
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'commodity_page.json')
+
+
+def test_ingest_recorded_fixture(tmp_path):
+    store = CommodityStore(str(tmp_path / 'prices.sqlite3'))
+    # A small page size makes the ingest page through the fixture like the live resource
+    stored = ingest(store, fixture_pages(FIXTURE), state='Gujarat', page_size=3, source=FIXTURE)
+
+    assert stored == 7
+    assert store.has_data('Gujarat')
+    assert not store.has_data('Maharashtra')
+    assert store.latest_date('Gujarat') == '2026-10-18'
+    assert store.latest_date('Gujarat', 'Rajkot') == '2026-10-18'
+
+    latest = store.query('Gujarat', 'Rajkot')
+    assert [(r['Market'], r['Commodity']) for r in latest] == [('Gondal', 'Wheat'), ('Rajkot', 'Cotton')]
+    assert latest[1] == {
+        'State': 'Gujarat', 'District': 'Rajkot', 'Market': 'Rajkot', 'Commodity': 'Cotton',
+        'Variety': 'Other', 'Grade': 'FAQ', 'Arrival_Date': '18/10/2026',
+        'Min_Price': '6800', 'Max_Price': '7605', 'Modal_Price': '7250'
+    }
+    assert len(store.query('Gujarat', 'Rajkot', '2026-10-17')) == 3
+    assert len(store.query('Gujarat')) == 4
+
+    runs = store._connection().execute("SELECT source, state, records FROM ingest_runs").fetchall()
+    assert runs == [(FIXTURE, 'Gujarat', 7)]
+    stats = store.stats()
+    assert stats['last_ingest_records'] == 7
+    assert (stats['first_date'], stats['last_date']) == ('2026-10-17', '2026-10-18')
+
+
+def test_reingest_upserts_instead_of_duplicating(tmp_path):
+    store = CommodityStore(str(tmp_path / 'prices.sqlite3'))
+    for _ in range(2):
+        ingest(store, fixture_pages(FIXTURE), state='Gujarat', page_size=5, source=FIXTURE)
+    assert store.stats()['records'] == 7
+    assert store._connection().execute("SELECT COUNT(*) FROM ingest_runs").fetchone()[0] == 2
+
+
+def test_store_is_fresh_only_after_a_recent_ingest(tmp_path):
+    store = CommodityStore(str(tmp_path / 'prices.sqlite3'))
+    assert not store.is_fresh('Gujarat')
+    ingest(store, fixture_pages(FIXTURE), state='Gujarat', source=FIXTURE)
+    assert store.is_fresh('Gujarat', max_age=60)
+    assert not store.is_fresh('Maharashtra', max_age=60)
+
+    store._connection().execute("UPDATE ingest_runs SET finished_at = finished_at - 120")
+    assert not store.is_fresh('Gujarat', max_age=60)
+    assert store.is_fresh('Gujarat', max_age=600)
+
+
+def test_latest_arrivals_matches_the_store_default(tmp_path):
+    with open(FIXTURE) as f:
+        records = [record for record in json.load(f)['records'] if record['State'] == 'Gujarat']
+    store = CommodityStore(str(tmp_path / 'prices.sqlite3'))
+    store.upsert(records)
+
+    latest = latest_arrivals(records)
+    assert {record['Arrival_Date'] for record in latest} == {'18/10/2026'}
+    assert sorted((r['Market'], r['Commodity']) for r in latest) == sorted(
+        (r['Market'], r['Commodity']) for r in store.query('Gujarat')
+    )
+    assert latest_arrivals([]) == []
@@ -0,0 +1,38 @@
+import math
+
+import pytest
+
+from geo_index import LocationIndex, parse_coords
+
+CATALOG = {"Gujarat": {"Ahmedabad": {"lat": 23.0225, "lon": 72.5714}, "Surat": {"lat": 21.1702, "lon": 72.8311}}}
+
+
+@pytest.mark.parametrize('data', [
+    {'lat': 'nan', 'lon': '72.5'},
+    {'lat': '23.0', 'lon': 'inf'},
+    {'lat': '-inf', 'lon': '72.5'},
+    {'lat': '91', 'lon': '72.5'},
+    {'lat': '23.0', 'lon': '-181'},
+    {'lat': 'abc', 'lon': '72.5'},
+    {'lat': None, 'lon': '72.5'},
+    {'lon': '72.5'},
+])
+def test_parse_coords_rejects_invalid_input(data):
+    assert parse_coords(data) is None
+
+
+def test_parse_coords_accepts_valid_input():
+    assert parse_coords({'lat': '23.02', 'lon': 72.57}) == (23.02, 72.57)
+
+
+def test_nearest_rejects_non_finite_coordinates():
+    index = LocationIndex.from_catalog(CATALOG)
+    for lat, lon in ((math.nan, 72.5), (23.0, math.inf)):
+        with pytest.raises(ValueError):
+            index.nearest(lat, lon)
+
+
+def test_nearest_finds_closest_district():
+    state, district, _, _, distance_km = LocationIndex.from_catalog(CATALOG).nearest(21.2, 72.8)
+    assert (state, district) == ("Gujarat", "Surat")
+    assert distance_km < 5
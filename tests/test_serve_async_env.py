@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SETTINGS = {
+    'PREWARM_ENABLED': 'true',
+    'ASYNC_MAX_CONNECTIONS': '7',
+    'FORECAST_CACHE_TTL': '123',
+    'UPSTREAM_POOL_SIZE': '3',
+}
+
+
+def test_settings_from_dotenv_apply_in_async_mode(tmp_path):
+    (tmp_path / '.env').write_text(''.join(f"{key}={value}\n" for key, value in SETTINGS.items()))
+    env = {key: value for key, value in os.environ.items() if key not in SETTINGS}
+    env['PYTHONPATH'] = REPO
+    script = (
+        "import serve_async, prewarm, forecast_cache, upstream\n"
+        "print(serve_async.PREWARM_ENABLED, serve_async.ASYNC_MAX_CONNECTIONS, "
+        "forecast_cache.forecast_cache.ttl, upstream.UPSTREAM_POOL_SIZE)\n"
+    )
+    # Run from the directory holding .env, as a deployment would
+    result = subprocess.run([sys.executable, '-c', script], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ['True', '7', '123', '3']
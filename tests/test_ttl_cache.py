@@ -0,0 +1,25 @@
+from ttl_cache import TTLCache
+
+
+def test_stats_count_stale_hits_as_lookups():
+    cache = TTLCache(ttl=60, maxsize=10, max_stale=600)
+    cache.set('fresh', 1)
+    cache.set('stale', 2, age=120)
+
+    assert cache.get_entry('fresh')[0] == 1
+    assert cache.get_entry('stale')[0] == 2
+    assert cache.get_entry('stale')[0] == 2
+    assert cache.get_entry('missing') is None
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['stale_hits'], stats['misses']) == (1, 2, 1)
+    assert stats['hit_rate'] == 0.25
+    assert stats['stale_hit_rate'] == 0.5
+
+
+def test_expired_entries_are_dropped():
+    cache = TTLCache(ttl=60, maxsize=10, max_stale=60)
+    cache.set('old', 1, age=200)
+    assert cache.get_entry('old') is None
+    assert cache.get('old') is None
+    assert cache.stats()['size'] == 0
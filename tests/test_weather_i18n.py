@@ -0,0 +1,64 @@
+import threading
+import time
+
+from weather_i18n import CatalogStore
+
+
+def upper(text, language):
+    return text.upper()
+
+
+def test_build_translates_once_and_saves(tmp_path):
+    calls = []
+
+    def translate(text, language):
+        calls.append(language)
+        return upper(text, language)
+
+    store = CatalogStore(translate, names=["Rajkot"], directory=tmp_path)
+    catalog = store.get('hi')
+    assert catalog.text('humidity') == "HUMIDITY"
+    assert catalog.name("Rajkot") == "RAJKOT"
+    assert store.get('hi') is catalog
+    assert calls == ['hi']
+    assert CatalogStore(translate, names=["Rajkot"], directory=tmp_path).get('hi').text('humidity') == "HUMIDITY"
+    assert calls == ['hi']
+
+
+def test_failed_build_serves_english_until_retry(tmp_path):
+    calls = []
+
+    def translate(text, language):
+        calls.append(language)
+        raise RuntimeError("translator down")
+
+    store = CatalogStore(translate, directory=tmp_path, retry_after=60)
+    assert store.get('hi').text('humidity') == "Humidity"
+    assert store.get('hi').text('humidity') == "Humidity"
+    assert calls == ['hi']
+
+    store._fallbacks['hi'] = (store._fallbacks['hi'][0], time.monotonic() - 1)
+    store.translate = upper
+    assert store.get('hi').text('humidity') == "HUMIDITY"
+    assert 'hi' not in store._fallbacks
+
+
+def test_slow_build_times_out_without_blocking_other_languages(tmp_path):
+    release = threading.Event()
+
+    def translate(text, language):
+        if language == 'hi':
+            release.wait(5)
+        return upper(text, language)
+
+    store = CatalogStore(translate, directory=tmp_path, timeout=0.2, retry_after=60)
+    slow = threading.Thread(target=store.get, args=('hi',))
+    slow.start()
+    time.sleep(0.05)
+    started = time.monotonic()
+    assert store.get('gu').text('humidity') == "HUMIDITY"
+    assert time.monotonic() - started < 0.2
+    slow.join(2)
+    assert not slow.is_alive()
+    assert store.get('hi').text('humidity') == "Humidity"
+    release.set()
@@ -0,0 +1,195 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from singleflight import translation_flights
+
+TRANSLATION_CACHE_PATH = os.environ.get('TRANSLATION_CACHE_PATH', 'translation_cache.sqlite3')
+TRANSLATION_CACHE_SIZE = int(os.environ.get('TRANSLATION_CACHE_SIZE', 20000))
+TRANSLATION_CACHE_MAX_ROWS = int(os.environ.get('TRANSLATION_CACHE_MAX_ROWS', 500000))
+# Cache hits whose last_used is written back to SQLite in one batch
+TOUCH_BATCH_SIZE = 500
+
+
+def normalize_segment(segment):
+    """Collapse whitespace so trivially different lines share a cache entry"""
+    return ' '.join(segment.split())
+
+
+class TranslationCache:
+    """Two-tier (in-memory LRU over SQLite) cache of translated segments"""
+
+    def __init__(self, path=TRANSLATION_CACHE_PATH, maxsize=TRANSLATION_CACHE_SIZE,
+                 max_rows=TRANSLATION_CACHE_MAX_ROWS):
+        self.path = path
+        self.maxsize = maxsize
+        self.max_rows = max_rows
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._writes = 0
+        # Keys served since last_used was last written, so pruning sees real recency
+        self._touched = set()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _connection(self):
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "language TEXT NOT NULL, source TEXT NOT NULL, translated TEXT NOT NULL, "
+                "last_used REAL NOT NULL, PRIMARY KEY (language, source))"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)")
+            self._db.commit()
+        return self._db
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def get_many(self, segments, language):
+        """Return {segment: translation} for the segments already cached"""
+        found = {}
+        with self._lock:
+            pending = []
+            for segment in segments:
+                key = (language, segment)
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[segment] = self._memory[key]
+                    self._touched.add(key)
+                    self.memory_hits += 1
+                else:
+                    pending.append(segment)
+
+            if not pending and len(self._touched) < TOUCH_BATCH_SIZE:
+                return found
+
+            try:
+                db = self._connection()
+                for segment in pending:
+                    row = db.execute(
+                        "SELECT translated FROM translations WHERE language = ? AND source = ?",
+                        (language, segment)
+                    ).fetchone()
+                    if row:
+                        found[segment] = row[0]
+                        self._remember((language, segment), row[0])
+                        self._touched.add((language, segment))
+                        self.disk_hits += 1
+                    else:
+                        self.misses += 1
+                if len(self._touched) >= TOUCH_BATCH_SIZE:
+                    self._flush_touched(db)
+                    db.commit()
+            except sqlite3.Error as e:
+                print(f"Translation cache read failed: {e}")
+                self.misses += len(pending)
+
+        return found
+
+    def set_many(self, translations, language):
+        """Store (segment, translation) pairs in both tiers"""
+        translations = list(translations)
+        now = time.time()
+        with self._lock:
+            for segment, translated in translations:
+                self._remember((language, segment), translated)
+
+            try:
+                db = self._connection()
+                db.executemany(
+                    "INSERT OR REPLACE INTO translations (language, source, translated, last_used) VALUES (?, ?, ?, ?)",
+                    [(language, segment, translated, now) for segment, translated in translations]
+                )
+                self._writes += len(translations)
+                if self._writes >= 1000:
+                    self._writes = 0
+                    self._flush_touched(db)
+                    self._prune(db)
+                db.commit()
+            except sqlite3.Error as e:
+                print(f"Translation cache write failed: {e}")
+
+    def _flush_touched(self, db):
+        """Write back last_used for the rows served since the last flush"""
+        if self._touched:
+            now = time.time()
+            db.executemany(
+                "UPDATE translations SET last_used = ? WHERE language = ? AND source = ?",
+                [(now, language, segment) for language, segment in self._touched]
+            )
+            self._touched.clear()
+
+    def _prune(self, db):
+        """Drop the least recently used rows once the on-disk tier grows past max_rows"""
+        count = db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        if count > self.max_rows:
+            db.execute(
+                "DELETE FROM translations WHERE rowid IN "
+                "(SELECT rowid FROM translations ORDER BY last_used LIMIT ?)",
+                (count - self.max_rows,)
+            )
+
+    def stats(self):
+        with self._lock:
+            return {
+                'memory_size': len(self._memory),
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses
+            }
+
+
+def _translate_missing(segments, translate):
+    """Translate segments in one call when the translator keeps line breaks intact"""
+    translated = translate('\n'.join(segments))
+    lines = translated.split('\n') if translated else []
+    if len(lines) == len(segments):
+        return [line.strip() for line in lines]
+    return [translate(segment) for segment in segments]
+
+
+def translate_segments(text, target_language, translate, cache=None):
+    """Translate text line by line, sending only uncached lines to translate.
+
+    translate is a callable taking and returning a string. Leading and
+    trailing whitespace of each line is preserved around the translation.
+    """
+    cache = cache or translation_cache
+    lines = text.split('\n')
+    segments = [normalize_segment(line) for line in lines]
+    unique = list(dict.fromkeys(segment for segment in segments if segment))
+
+    found = cache.get_many(unique, target_language)
+    missing = [segment for segment in unique if segment not in found]
+    if missing:
+        # Concurrent requests for the same uncached text share one translator call
+        translated = translation_flights.do(
+            (target_language, tuple(missing)), _translate_missing, missing, translate
+        )
+        # Untranslated fallbacks come back unchanged and must not be cached
+        pairs = [(segment, result) for segment, result in zip(missing, translated) if result and result != segment]
+        cache.set_many(pairs, target_language)
+        found.update(pairs)
+
+    output = []
+    for line, segment in zip(lines, segments):
+        if not segment:
+            output.append(line)
+            continue
+        leading = line[:len(line) - len(line.lstrip())]
+        trailing = line[len(line.rstrip()):]
+        output.append(f"{leading}{found.get(segment, segment)}{trailing}")
+    return '\n'.join(output)
+
+
+# Shared by app.py and app_voice.py
+translation_cache = TranslationCache()
@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Thread-safe in-process TTL cache with LRU eviction and hit/miss counters.
+
+    Entries up to max_stale seconds past ttl can still be read with get_entry.
+    """
+
+    def __init__(self, ttl, maxsize, max_stale=0):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.max_stale = max_stale
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _lookup(self, key):
+        """Return (value, age) for a servable entry, dropping ones past max_stale"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        stored_at, value = entry
+        age = time.monotonic() - stored_at
+        if age > self.ttl + self.max_stale:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value, age
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired"""
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None or entry[1] > self.ttl:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return entry[0]
+
+    def get_entry(self, key):
+        """Return (value, age_seconds) including expired-but-servable entries, or None"""
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                self.misses += 1
+            elif entry[1] > self.ttl:
+                self.stale_hits += 1
+            else:
+                self.hits += 1
+            return entry
+
+    def peek(self, key):
+        """Return (value, age_seconds) for key without touching counters or LRU order"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            return entry[1], time.monotonic() - entry[0]
+
+    def set(self, key, value, age=0):
+        """Store value under key, evicting the least recently used entries.
+
+        age back-dates the entry, so extending a cached value with newly
+        fetched fields does not extend the lifetime of the older ones.
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() - age, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return cache counters for monitoring"""
+        with self._lock:
+            # Stale hits are lookups too; they are reported apart from fresh hits
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'max_stale': self.max_stale,
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'stale_hit_rate': round(self.stale_hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,124 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from singleflight import tts_flights
+
+TTS_CACHE_DIR = os.environ.get('TTS_CACHE_DIR', 'tts_cache')
+TTS_CACHE_MAX_BYTES = int(os.environ.get('TTS_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+# Audio URLs are content-addressed, so clients may keep them for a year
+TTS_AUDIO_MAX_AGE = 365 * 24 * 3600
+
+KEY_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+
+def speech_key(text, tts_lang):
+    """Content address of the speech for text in tts_lang"""
+    return hashlib.sha256(f"{tts_lang}\0{text}".encode('utf-8')).hexdigest()
+
+
+class TTSCache:
+    """Content-addressed mp3 files on disk with a size cap and LRU eviction"""
+
+    def __init__(self, directory=TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._sizes = None
+        self._total = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def _index(self):
+        """Load key -> size in least-recently-used order from the directory, once"""
+        if self._sizes is None:
+            os.makedirs(self.directory, exist_ok=True)
+            entries = []
+            for entry in os.scandir(self.directory):
+                key, ext = os.path.splitext(entry.name)
+                if ext == '.mp3' and KEY_PATTERN.match(key):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, key, stat.st_size))
+            self._sizes = OrderedDict((key, size) for _, key, size in sorted(entries))
+            self._total = sum(self._sizes.values())
+        return self._sizes
+
+    def get(self, key):
+        """Return the file path for key if cached, marking it recently used"""
+        with self._lock:
+            sizes = self._index()
+            if key not in sizes:
+                self.misses += 1
+                return None
+            sizes.move_to_end(key)
+            self.hits += 1
+        path = self.path(key)
+        try:
+            # mtime carries the LRU order across restarts
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._total -= sizes.pop(key, 0)
+            return None
+        return path
+
+    def put(self, key, audio):
+        """Store mp3 bytes under key and evict least recently used files past the cap"""
+        path = self.path(key)
+        with self._lock:
+            self._index()
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(audio)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            sizes = self._index()
+            self._total += len(audio) - sizes.pop(key, 0)
+            sizes[key] = len(audio)
+            while self._total > self.max_bytes and len(sizes) > 1:
+                old_key, size = sizes.popitem(last=False)
+                self._total -= size
+                self.evictions += 1
+                try:
+                    os.remove(self.path(old_key))
+                except FileNotFoundError:
+                    pass
+        return path
+
+    def get_or_create(self, text, tts_lang, synthesize):
+        """Return the key of the speech for text, calling synthesize(text, tts_lang) -> bytes on a miss"""
+        key = speech_key(text, tts_lang)
+        if self.get(key) is None:
+            # Concurrent requests for the same phrase share one synthesis
+            tts_flights.do(key, self._create, key, text, tts_lang, synthesize)
+        return key
+
+    def _create(self, key, text, tts_lang, synthesize):
+        with self._lock:
+            if key in self._index():
+                return
+        self.put(key, synthesize(text, tts_lang))
+
+    def stats(self):
+        with self._lock:
+            sizes = self._index()
+            lookups = self.hits + self.misses
+            return {
+                'files': len(sizes),
+                'bytes': self._total,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+tts_cache = TTSCache()
@@ -0,0 +1,174 @@
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+UPSTREAM_POOL_SIZE = int(os.environ.get('UPSTREAM_POOL_SIZE', 20))
+# Consecutive failed calls that open an upstream's circuit, and seconds before a trial call
+UPSTREAM_BREAKER_FAILURES = int(os.environ.get('UPSTREAM_BREAKER_FAILURES', 5))
+UPSTREAM_BREAKER_RESET = float(os.environ.get('UPSTREAM_BREAKER_RESET', 30))
+
+# Per-upstream (connect, read) timeouts and retry budgets
+UPSTREAMS = {
+    'open_meteo': {'timeout': (3.05, 10), 'retries': 2, 'backoff': 0.3},
+    'data_gov': {'timeout': (5, 20), 'retries': 2, 'backoff': 0.5},
+}
+DEFAULT_UPSTREAM = {'timeout': (5, 15), 'retries': 1, 'backoff': 0.5}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling an upstream whose circuit is open"""
+
+
+class CircuitBreaker:
+    """Fails fast after repeated upstream failures, letting one trial call through after a cooldown"""
+
+    def __init__(self, name, failure_threshold=UPSTREAM_BREAKER_FAILURES, reset_timeout=UPSTREAM_BREAKER_RESET):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self):
+        """Return True if a call may go upstream now"""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    print(f"Circuit for {self.name} opened after {self.failures} failures")
+                self.opened_at = time.monotonic()
+
+    def stats(self):
+        with self._lock:
+            return {'state': self.state, 'failures': self.failures}
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(upstream):
+    with _breakers_lock:
+        breaker = _breakers.get(upstream)
+        if breaker is None:
+            breaker = _breakers[upstream] = CircuitBreaker(upstream)
+        return breaker
+
+
+def breaker_stats():
+    """Return circuit state for every upstream called so far"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
+
+
+def get_session(url):
+    """Return the shared keep-alive session for the host of url"""
+    host = urlsplit(url).netloc
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            # Up to pool_maxsize sockets per host are kept alive; calls beyond that open a
+            # short-lived extra connection rather than waiting, unbounded, for a pooled one
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=UPSTREAM_POOL_SIZE,
+                max_retries=0
+            )
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _sessions[host] = session
+        return session
+
+
+def _backoff_delay(backoff, attempt):
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, backoff * (2 ** attempt))
+
+
+def get(upstream, url, params=None):
+    """GET url through the pooled session for upstream, retrying transient failures.
+
+    Returns the response on success and raises requests exceptions otherwise,
+    so callers keep their existing error handling. While the upstream's
+    circuit is open this raises CircuitOpenError without any network call.
+    """
+    breaker = get_breaker(upstream)
+    if not breaker.allow():
+        raise CircuitOpenError(f"{upstream} circuit is open, skipping request")
+
+    try:
+        response = _get_with_retries(upstream, url, params)
+    except requests.exceptions.HTTPError as e:
+        # Only server-side errors say anything about the upstream's health
+        if e.response is not None and e.response.status_code in RETRY_STATUSES:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        raise
+    except Exception:
+        breaker.record_failure()
+        raise
+
+    breaker.record_success()
+    return response
+
+
+def _get_with_retries(upstream, url, params):
+    config = UPSTREAMS.get(upstream, DEFAULT_UPSTREAM)
+    session = get_session(url)
+    retries = config['retries']
+
+    for attempt in range(retries + 1):
+        try:
+            response = session.get(url, params=params, timeout=config['timeout'])
+            if response.status_code in RETRY_STATUSES and attempt < retries:
+                response.close()
+                print(f"{upstream} returned {response.status_code}, retrying ({attempt + 1}/{retries})")
+            else:
+                response.raise_for_status()
+                return response
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            if attempt >= retries:
+                raise
+            print(f"{upstream} request failed: {e}, retrying ({attempt + 1}/{retries})")
+
+        time.sleep(_backoff_delay(config['backoff'], attempt))
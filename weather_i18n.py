@@ -0,0 +1,253 @@
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+LOCALE_DIR = os.environ.get('LOCALE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'locales'))
+# Longest a request waits on the translator while a catalog is built
+CATALOG_BUILD_TIMEOUT = float(os.environ.get('CATALOG_BUILD_TIMEOUT', 30))
+# After a failed build, English text is served for this many seconds before trying again
+CATALOG_RETRY_SECONDS = int(os.environ.get('CATALOG_RETRY_SECONDS', 300))
+
+# Phrases used by the weather formatters. {0} marks text interpolated at render time.
+SOURCE_STRINGS = {
+    'current_weather_in': "Current Weather in {0}:",
+    'weather_in': "Weather in {0}:",
+    'temperature': "Temperature",
+    'feels_like': "Feels like",
+    'condition': "Condition",
+    'humidity': "Humidity",
+    'precipitation': "Precipitation",
+    'wind_speed': "Wind Speed",
+    'todays_range': "Today's Range",
+    'sunrise': "Sunrise",
+    'sunset': "Sunset",
+    'next_24_hours': "Next 24 Hours",
+    'rain_chance': "rain chance",
+    'chance': "chance",
+    'forecast_14_day': "14-Day Forecast",
+    'tips': "Tips",
+    'tip_very_hot': "Very hot! Stay hydrated and avoid sun exposure",
+    'tip_hot': "Hot weather - wear light clothing",
+    'tip_cool': "Cool weather - carry a jacket",
+    'tip_rain': "Rain expected - carry an umbrella",
+    'fetch_failed': "Sorry, I couldn't fetch the weather data. Please try again.",
+    'stale_notice': "Showing weather data last updated {0} minutes ago.",
+}
+
+WEATHER_CODES = {
+    0: "Clear sky",
+    1: "Mainly clear",
+    2: "Partly cloudy",
+    3: "Overcast",
+    45: "Foggy",
+    48: "Depositing rime fog",
+    51: "Light drizzle",
+    53: "Moderate drizzle",
+    55: "Dense drizzle",
+    56: "Light freezing drizzle",
+    57: "Dense freezing drizzle",
+    61: "Slight rain",
+    63: "Moderate rain",
+    65: "Heavy rain",
+    66: "Light freezing rain",
+    67: "Heavy freezing rain",
+    71: "Slight snow fall",
+    73: "Moderate snow fall",
+    75: "Heavy snow fall",
+    77: "Snow grains",
+    80: "Slight rain showers",
+    81: "Moderate rain showers",
+    82: "Violent rain showers",
+    85: "Slight snow showers",
+    86: "Heavy snow showers",
+    95: "Thunderstorm",
+    96: "Thunderstorm with slight hail",
+    99: "Thunderstorm with heavy hail"
+}
+
+DAY_NAMES = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+MONTH_NAMES = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+# Full names translate far more reliably than three-letter abbreviations
+_DAY_SOURCE = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+_MONTH_SOURCE = ["January", "February", "March", "April", "May", "June", "July", "August",
+                 "September", "October", "November", "December"]
+
+_PLACEHOLDER = re.compile(r'\{\d+\}')
+
+# A build that outlives its timeout keeps running here without holding up requests
+_builder = ThreadPoolExecutor(max_workers=4, thread_name_prefix='catalog')
+
+
+class Catalog:
+    """Localized weather phrases for one language"""
+
+    def __init__(self, language, strings, weather_codes, days, months, names):
+        self.language = language
+        self.strings = strings
+        self.weather_codes = weather_codes
+        self.days = days
+        self.months = months
+        self.names = names
+
+    def text(self, key, *values):
+        return self.strings.get(key, SOURCE_STRINGS[key]).format(*values)
+
+    def weather(self, code):
+        return self.weather_codes.get(code, self.weather_codes.get(-1, "Unknown"))
+
+    def name(self, name):
+        return self.names.get(name, name)
+
+    def day_label(self, date):
+        """Localized equivalent of date.strftime('%a, %b %d')"""
+        return f"{self.days[date.weekday()]}, {self.months[date.month - 1]} {date.day:02d}"
+
+
+def _english_catalog():
+    codes = dict(WEATHER_CODES)
+    codes[-1] = "Unknown"
+    return Catalog('en', dict(SOURCE_STRINGS), codes, list(DAY_NAMES), list(MONTH_NAMES), {})
+
+
+class CatalogStore:
+    """Builds, persists and serves per-language catalogs.
+
+    Every phrase is sent to translate once per language; the results are
+    written to LOCALE_DIR/<language>.json and reused on later runs, so
+    rendering a forecast never calls the translator. If a build fails or
+    times out, the partial catalog (English where untranslated) is served
+    until retry_after seconds have passed.
+    """
+
+    def __init__(self, translate, names=(), directory=LOCALE_DIR, timeout=CATALOG_BUILD_TIMEOUT,
+                 retry_after=CATALOG_RETRY_SECONDS):
+        self.translate = translate
+        self.names = list(dict.fromkeys(names))
+        self.directory = directory
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._catalogs = {'en': _english_catalog()}
+        # language -> (incomplete catalog, monotonic time of the next build attempt)
+        self._fallbacks = {}
+        # One lock per language, so a slow build never holds up the others
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, language):
+        catalog = self._catalogs.get(language)
+        if catalog is not None:
+            return catalog
+        fallback = self._fallbacks.get(language)
+        if fallback is not None and time.monotonic() < fallback[1]:
+            return fallback[0]
+        return None
+
+    def get(self, language):
+        catalog = self._cached(language)
+        if catalog is not None:
+            return catalog
+        with self._lock:
+            lock = self._locks.setdefault(language, threading.Lock())
+        with lock:
+            catalog = self._cached(language)
+            if catalog is not None:
+                return catalog
+            catalog, complete = self._load_or_build(language)
+            if complete:
+                self._catalogs[language] = catalog
+                self._fallbacks.pop(language, None)
+            else:
+                self._fallbacks[language] = (catalog, time.monotonic() + self.retry_after)
+            return catalog
+
+    def _path(self, language):
+        return os.path.join(self.directory, f"{language}.json")
+
+    def _load_or_build(self, language):
+        stored = {}
+        try:
+            with open(self._path(language), encoding='utf-8') as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable catalog for {language}: {e}")
+
+        sources = self._sources()
+        missing = [source for source in sources if source not in stored]
+        complete = True
+        if missing:
+            print(f"Building {language} weather catalog ({len(missing)} phrases)")
+            translated = self._translate_all(missing, language)
+            if translated is None:
+                complete = False
+            else:
+                stored.update(translated)
+                self._save(language, stored)
+
+        strings = {key: stored.get(source, source) for key, source in SOURCE_STRINGS.items()}
+        codes = {code: stored.get(source, source) for code, source in WEATHER_CODES.items()}
+        codes[-1] = stored.get("Unknown", "Unknown")
+        days = [stored.get(source, source) for source in _DAY_SOURCE]
+        months = [stored.get(source, source) for source in _MONTH_SOURCE]
+        names = {name: stored.get(name, name) for name in self.names}
+        return Catalog(language, strings, codes, days, months, names), complete
+
+    def _sources(self):
+        sources = list(SOURCE_STRINGS.values()) + list(WEATHER_CODES.values()) + ["Unknown"]
+        sources += _DAY_SOURCE + _MONTH_SOURCE + self.names
+        return list(dict.fromkeys(sources))
+
+    def _translate_all(self, sources, language):
+        """Translate sources, returning None when the translator fails or exceeds timeout"""
+        future = _builder.submit(self._translate_sources, sources, language)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            print(f"Building {language} weather catalog timed out after {self.timeout}s")
+        except Exception as e:
+            print(f"Building {language} weather catalog failed: {e}")
+        return None
+
+    def _translate_sources(self, sources, language):
+        text = '\n'.join(sources)
+        translated = self.translate(text, language)
+        # translate_text hands back its input unchanged when the translator fails
+        if translated == text:
+            return None
+
+        translated = translated.split('\n')
+        if len(translated) != len(sources):
+            translated = [self.translate(source, language) for source in sources]
+
+        results = {}
+        for source, result in zip(sources, translated):
+            result = result.strip()
+            # Keep the English phrase if the translator dropped a placeholder
+            if result and sorted(_PLACEHOLDER.findall(result)) == sorted(_PLACEHOLDER.findall(source)):
+                results[source] = result
+            else:
+                results[source] = source
+        return results
+
+    def _save(self, language, stored):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self._path(language), 'w', encoding='utf-8') as f:
+                json.dump(stored, f, ensure_ascii=False, indent=2, sort_keys=True)
+        except OSError as e:
+            print(f"Could not save {language} catalog: {e}")
+
+
+if __name__ == '__main__':
+    # Pre-build catalogs ahead of deployment: python weather_i18n.py [app|app_voice]
+    import importlib
+    import sys
+
+    module = importlib.import_module(sys.argv[1] if len(sys.argv) > 1 else 'app')
+    for code in module.SUPPORTED_LANGUAGES:
+        module.catalogs.get(code)